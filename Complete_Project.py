@@ -1,1537 +1,2660 @@
-# Project.py
-import os
-import io
-import json
-from datetime import datetime
-
-from flask import (
-    Flask,
-    request,
-    jsonify,
-    render_template_string,
-    redirect,
-    url_for,
-    session,
-)
-
-from google import genai
-from google.genai import types
-
-from PyPDF2 import PdfReader       # for PDF
-import docx                        # for DOCX
-
-# --- MongoDB Imports ---
-from pymongo import MongoClient
-from bson.objectid import ObjectId
-from werkzeug.security import generate_password_hash, check_password_hash
-import gridfs
-
-# --- Flask Setup ---
-
-app = Flask(__name__)
-app.secret_key = os.environ.get("FLASK_SECRET_KEY", os.urandom(24).hex())
-
-# --- MongoDB Setup ---
-
-MONGODB_URI = os.environ.get("MONGODB_URI", "mongodb://localhost:27017")
-MONGODB_DB_NAME = os.environ.get("MONGODB_DB_NAME", "textbook_quality_db")
-
-mongo_client = MongoClient(MONGODB_URI)
-mongo_db = mongo_client[MONGODB_DB_NAME]
-
-users_collection = mongo_db["users"]
-evaluations_collection = mongo_db["evaluations"]
-files_fs = gridfs.GridFS(mongo_db)  # for storing uploaded document binaries
-
-# --- Gemini API Setup ---
-
-GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "")
-
-try:
-    client = genai.Client(api_key=GEMINI_API_KEY) if GEMINI_API_KEY else None
-    if client:
-        print("Gemini Client initialized successfully.")
-    else:
-        print("Gemini Client not initialized: GEMINI_API_KEY missing.")
-except Exception as e:
-    print(f"ERROR: Could not initialize Gemini Client. Error: {e}")
-    client = None
-
-# --- Gemini Schema and Evaluation Logic ---
-
-EVALUATION_SCHEMA = types.Schema(
-    type=types.Type.OBJECT,
-    properties={
-        "accuracy_score": types.Schema(
-            type=types.Type.NUMBER,
-            description="Numerical score from 0 to 100 representing content accuracy."
-        ),
-        "accuracy": types.Schema(
-            type=types.Type.STRING,
-            description=(
-                "Short explanation/justification of the accuracy score, "
-                "commenting on factual correctness and domain alignment."
-            ),
-        ),
-        "readability_score": types.Schema(
-            type=types.Type.NUMBER,
-            description="Numerical score from 0 to 100 representing readability."
-        ),
-        "readability": types.Schema(
-            type=types.Type.STRING,
-            description=(
-                "Short explanation/justification of the readability score, "
-                "including clarity, structure, and ease of understanding."
-            ),
-        ),
-        "consistency_score": types.Schema(
-            type=types.Type.NUMBER,
-            description="Numerical score from 0 to 100 representing internal consistency."
-        ),
-        "consistency": types.Schema(
-            type=types.Type.STRING,
-            description=(
-                "Short explanation/justification of the consistency score, "
-                "commenting on terminology, notation, tone, and logical flow."
-            ),
-        ),
-        "overall_rating": types.Schema(
-            type=types.Type.NUMBER,
-            description=(
-                "Overall quality rating on a 0 to 5 scale. "
-                "You may use one decimal place (e.g., 4.3)."
-            ),
-        ),
-        "summary": types.Schema(
-            type=types.Type.STRING,
-            description=(
-                "2–4 sentence summary of the main strengths and weaknesses "
-                "of the material."
-            ),
-        ),
-    },
-    required=[
-        "accuracy_score",
-        "accuracy",
-        "readability_score",
-        "readability",
-        "consistency_score",
-        "consistency",
-        "overall_rating",
-        "summary",
-    ],
-)
-
-# ---------- Helper to extract text from non-image files ----------
-
-def extract_text_from_file_bytes(filename: str, raw_bytes: bytes) -> str:
-    """
-    Extracts text from bytes of an uploaded file.
-    Supports PDF, DOCX and TXT. Images are handled separately.
-    """
-    filename_lower = (filename or "").lower()
-
-    if filename_lower.endswith(".pdf"):
-        reader = PdfReader(io.BytesIO(raw_bytes))
-        pages_text = []
-        for page in reader.pages:
-            try:
-                pages_text.append(page.extract_text() or "")
-            except Exception:
-                continue
-        text = "\n".join(pages_text)
-
-    elif filename_lower.endswith(".docx"):
-        doc = docx.Document(io.BytesIO(raw_bytes))
-        text = "\n".join(p.text for p in doc.paragraphs)
-
-    elif filename_lower.endswith(".txt"):
-        text = raw_bytes.decode("utf-8", errors="ignore")
-
-    else:
-        raise ValueError("Unsupported document type. Please upload PDF, DOCX, or TXT.")
-
-    # Limit text size to avoid overloading the model (trim very long books)
-    MAX_CHARS = 20000
-    if len(text) > MAX_CHARS:
-        text = text[:MAX_CHARS]
-
-    if not text.strip():
-        raise ValueError("No readable text found in the uploaded file.")
-
-    return text
-
-
-# ---------- Gemini evaluation (text and/or image) ----------
-
-def evaluate_textbook_gemini(
-    text_content: str | None = None,
-    image_bytes: bytes | None = None,
-    image_mime: str | None = None,
-):
-    """
-    Calls Gemini to evaluate either:
-      - pure text (pdf/doc/txt), or
-      - an image (photo of a page), or
-      - both together.
-    Returns a dict following EVALUATION_SCHEMA.
-    """
-    if client is None:
-        return {
-            "error": "Analysis Error: Gemini Client not initialized. Set GEMINI_API_KEY correctly."
-        }
-
-    if (not text_content or not text_content.strip()) and image_bytes is None:
-        return {"error": "No content to analyze."}
-
-    prompt = (
-        "You are an educational content quality reviewer. "
-        "You will be given either textual content or an image of textbook/reference book pages. "
-        "If an image is provided, read the text from the image first, then evaluate it.\n\n"
-        "Based only on the provided material (it may be partial), evaluate the content on:\n\n"
-        "1. Accuracy – Give a numerical score from 0 to 100 for factual correctness and "
-        "   alignment with standard knowledge in the field, and a short explanation.\n"
-        "2. Readability – Give a numerical score from 0 to 100 for clarity, structure, "
-        "   and ease of understanding, and a short explanation.\n"
-        "3. Consistency – Give a numerical score from 0 to 100 for internal consistency "
-        "   (terminology, notation, tone, logical flow), and a short explanation.\n"
-        "4. Overall Rating – Give one overall quality rating on a 0 to 5 scale "
-        "   (you may use one decimal place, e.g., 4.2).\n\n"
-        "Return your answer strictly using the provided JSON schema, filling:\n"
-        "- accuracy_score (0–100), accuracy (text explanation)\n"
-        "- readability_score (0–100), readability (text explanation)\n"
-        "- consistency_score (0–100), consistency (text explanation)\n"
-        "- overall_rating (0–5, number)\n"
-        "- summary (2–4 sentences summary).\n"
-    )
-
-    contents: list = [prompt]
-
-    if text_content and text_content.strip():
-        contents.append(text_content)
-
-    if image_bytes is not None:
-        mime = image_mime or "image/jpeg"
-        img_part = types.Part.from_bytes(data=image_bytes, mime_type=mime)
-        contents.append(img_part)
-
-    try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=contents,
-            config=types.GenerateContentConfig(
-                response_mime_type="application/json",
-                response_schema=EVALUATION_SCHEMA,
-                temperature=0.0,
-            ),
-        )
-        return json.loads(response.text)
-    except Exception as e:
-        print(f"Gemini API call failed: {e}")
-        return {
-            "error": f"Analysis Error: API call failed or returned invalid data. Details: {e}"
-        }
-
-
-# ===================== Flask Template Strings =====================
-
-login_html = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-  <meta charset="UTF-8" />
-  <title>Textbook Quality Assessment — Login</title>
-  <meta name="viewport" content="width=device-width, initial-scale=1.0" />
-  <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700&display=swap" rel="stylesheet">
-  <script src="https://unpkg.com/lucide@latest"></script>
-  <style>
-    :root{
-      --color-primary: #2563EB;
-      --color-accent: #22C55E;
-      --color-bg-start: #0f172a;
-      --color-bg-end: #1d4ed8;
-      --color-card: #FFFFFF;
-      --color-text: #111827;
-      --color-warn: #DC2626;
-    }
-    *{ box-sizing:border-box; margin: 0; padding: 0; }
-    body{
-      min-height:100vh; color:var(--color-text);
-      font-family: 'Inter', sans-serif;
-      background: radial-gradient(circle at top, var(--color-bg-end), var(--color-bg-start));
-      display:flex; justify-content:center; align-items:center;
-      padding: 20px;
-      background-color: #e5e7eb;
-    }
-    .card-container {
-        opacity: 0;
-        transform: translateY(20px);
-        animation: fadeIn 0.5s ease-out forwards;
-        animation-delay: 0.2s;
-        width: 100%;
-        max-width: 380px;
-    }
-    @keyframes fadeIn {
-        to {
-            opacity: 1;
-            transform: translateY(0);
-        }
-    }
-    .card{
-      background: var(--color-card);
-      border-radius: 12px;
-      box-shadow: 0 10px 30px rgba(0,0,0,0.1), 0 0 0 1px rgba(0,0,0,0.05);
-      padding: 35px;
-      width: 100%;
-      transition: all 0.3s ease;
-      border-top: 5px solid var(--color-primary);
-    }
-    .head{ text-align: center; margin-bottom: 25px; }
-    .title-wrapper {
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        gap: 10px;
-        margin-bottom: 5px;
-        transition: all 0.3s ease;
-    }
-    .title-wrapper:hover{
-        transform: scale(1.05);
-        transition: all 0.3s ease;
-    }
-    .title{
-        font-size: 24px; font-weight: 800; color: var(--color-primary);
-        letter-spacing: -0.5px;
-    }
-    .subtitle{ color: var(--color-text); font-size: 13px; opacity: 0.75; }
-    .field{ margin-bottom: 20px; }
-    label{ display: block; font-size: 14px; margin-bottom: 6px; font-weight: 600; color: var(--color-text); }
-    .input{
-      width: 100%; padding: 12px; border: 1px solid #D1D5DB; border-radius: 8px;
-      font-size: 16px; transition: border-color 0.3s, box-shadow 0.3s;
-      background-color: #F9FAFB;
-    }
-    .input:focus{
-        border-color: var(--color-primary);
-        outline: none;
-        box-shadow: 0 0 0 4px rgba(37, 99, 235, 0.25);
-    }
-    .actions{ display: flex; justify-content: space-between; gap: 15px; margin-top: 25px; }
-    .btn{
-      flex: 1; border: none; border-radius: 8px; color: white; font-weight: 700;
-      padding: 12px 15px; cursor: pointer; font-size: 15px;
-      transition: background-color 0.3s, transform 0.1s, box-shadow 0.3s;
-      box-shadow: 0 4px 6px rgba(0, 0, 0, 0.08);
-    }
-    .btn:active {
-        transform: translateY(1px);
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.08);
-    }
-    .btn.primary{ background-color: var(--color-primary); }
-    .btn.primary:hover{ background-color: #1d4ed8; }
-    .btn.alt{ background-color: var(--color-accent); }
-    .btn.alt:hover{ background-color: #16a34a; }
-    .error{ color: var(--color-warn); text-align: center; margin-top: 15px; font-size: 13px; font-weight: 600; }
-    .message{ color: var(--color-accent); text-align: center; margin-top: 15px; font-size: 13px; font-weight: 600; }
-    .login-form:hover {
-        transform: scale(1.02);
-        transition: all 0.4s ease;
-    }
-  </style>
-</head>
-<body>
-  <div class="card-container">
-    <main class="card" role="main">
-      <header class="head">
-        <div class="title-wrapper">
-            <i data-lucide="book-open-check" style="color: var(--color-primary); width: 26px; height: 26px;"></i>
-            <div class="title">TEXTBOOK QUALITY APP</div>
-            <i data-lucide="star" style="color: var(--color-accent); width: 24px; height: 24px;"></i>
-        </div>
-        <div class="subtitle">Sign in to assess textbooks, reference books, and e-books.</div>
-      </header>
-      {% if message %}<p class="message">{{ message }}</p>{% endif %}
-      {% if error %}<p class="error" role="alert">{{ error }}</p>{% endif %}
-      <form action="{{ url_for('login') }}" method="post" autocomplete="on" class="login-form">
-        <div class="field">
-          <label for="username">Email or User ID</label>
-          <input id="username" class="input" type="text" name="username" placeholder="e.g., reviewer@university.edu" required/>
-        </div>
-        <div class="field">
-          <label for="password">Password</label>
-          <input id="password" class="input" type="password" name="password" placeholder="••••••••" required/>
-        </div>
-        <div class="actions">
-          <button type="submit" class="btn primary">Login</button>
-          <button type="button" class="btn alt" onclick="window.location.href = '{{ url_for('register') }}'">Sign Up</button>
-        </div>
-      </form>
-    </main>
-  </div>
-  <script>
-    lucide.createIcons();
-  </script>
-</body>
-</html>
-"""
-
-register_html = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-  <meta charset="UTF-8" />
-  <title>Textbook Quality Assessment — Registration</title>
-  <meta name="viewport" content="width=device-width, initial-scale=1.0" />
-  <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700&display=swap" rel="stylesheet">
-  <script src="https://unpkg.com/lucide@latest"></script>
-  <style>
-    :root{
-      --color-primary: #2563EB;
-      --color-accent: #22C55E;
-      --color-bg-start: #f1f5f9;
-      --color-bg-end: #e5e7eb;
-      --color-card: #FFFFFF;
-      --color-text: #111827;
-      --color-warn: #DC2626;
-    }
-    *{ box-sizing:border-box; margin: 0; padding: 0; }
-    body{
-      min-height:100vh; color:var(--color-text);
-      font-family: 'Inter', sans-serif;
-      background: linear-gradient(135deg, var(--color-bg-start) 0%, var(--color-bg-end) 100%);
-      display:flex; justify-content:center; align-items:center;
-      padding: 20px;
-    }
-    .card-container {
-        opacity: 0;
-        transform: translateY(20px);
-        animation: fadeIn 0.5s ease-out forwards;
-        animation-delay: 0.2s;
-        width: 100%;
-        max-width: 420px;
-    }
-    @keyframes fadeIn {
-        to {
-            opacity: 1;
-            transform: translateY(0);
-        }
-    }
-    .card{
-      background: var(--color-card);
-      border-radius: 12px;
-      box-shadow: 0 10px 30px rgba(0,0,0,0.08), 0 0 0 1px rgba(0,0,0,0.04);
-      padding: 35px;
-      width: 100%;
-      transition: all 0.3s ease;
-      border-top: 5px solid var(--color-accent);
-    }
-    .head{ text-align: center; margin-bottom: 25px; }
-    .title-wrapper {
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        gap: 10px;
-        margin-bottom: 5px;
-        transition: all 0.3s ease;
-    }
-    .title{
-        font-size: 24px; font-weight: 800; color: var(--color-accent);
-        letter-spacing: -0.5px;
-    }
-    .subtitle{ color: var(--color-text); font-size: 13px; opacity: 0.75; }
-    .field{ margin-bottom: 20px; }
-    label{ display: block; font-size: 14px; margin-bottom: 6px; font-weight: 600; color: var(--color-text); }
-    .input{
-      width: 100%; padding: 12px; border: 1px solid #D1D5DB; border-radius: 8px;
-      font-size: 16px; transition: border-color 0.3s, box-shadow 0.3s;
-      background-color: #F9FAFB;
-    }
-    .input:focus{
-        border-color: var(--color-accent);
-        outline: none;
-        box-shadow: 0 0 0 4px rgba(34, 197, 94, 0.2);
-    }
-    .actions{ display: flex; justify-content: space-between; gap: 15px; margin-top: 25px; }
-    .btn{
-      flex: 1; border: none; border-radius: 8px; color: white; font-weight: 700;
-      padding: 12px 15px; cursor: pointer; font-size: 15px;
-      transition: background-color 0.3s, transform 0.1s, box-shadow 0.3s;
-      box-shadow: 0 4px 6px rgba(0, 0, 0, 0.08);
-    }
-    .btn:active {
-        transform: translateY(1px);
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.08);
-    }
-    .btn.primary{ background-color: var(--color-accent); }
-    .btn.primary:hover{ background-color: #16a34a; }
-    .btn.alt{ background-color: var(--color-primary); }
-    .btn.alt:hover{ background-color: #1d4ed8; }
-    .error{ color: var(--color-warn); text-align: center; margin-top: 15px; font-size: 13px; font-weight: 600; }
-    .message{ color: var(--color-accent); text-align: center; margin-top: 15px; font-size: 13px; font-weight: 600; }
-  </style>
-</head>
-<body>
-  <div class="card-container">
-    <main class="card" role="main">
-      <header class="head">
-        <div class="title-wrapper">
-            <i data-lucide="user-plus" style="color: var(--color-accent); width: 26px; height: 26px;"></i>
-            <div class="title">CREATE REVIEWER ACCOUNT</div>
-            <i data-lucide="shield-check" style="color: var(--color-primary); width: 24px; height: 24px;"></i>
-        </div>
-        <div class="subtitle">Register to assess the quality of textbooks and e-resources.</div>
-      </header>
-      {% if message %}<p class="message">{{ message }}</p>{% endif %}
-      {% if error %}<p class="error" role="alert">{{ error }}</p>{% endif %}
-      <form action="{{ url_for('register') }}" method="post" autocomplete="on">
-        <div class="field">
-          <label for="username">Username</label>
-          <input id="username" class="input" type="text" name="username" placeholder="Choose a username" required/>
-        </div>
-        <div class="field">
-          <label for="password">Password</label>
-          <input id="password" class="input" type="password" name="password" placeholder="Create a strong password" required/>
-        </div>
-        <div class="actions">
-          <button type="submit" class="btn primary">Register Account</button>
-          <button type="button" class="btn alt" onclick="window.location.href = '{{ url_for('login') }}'">Back to Login</button>
-        </div>
-      </form>
-    </main>
-  </div>
-  <script>
-    lucide.createIcons();
-  </script>
-</body>
-</html>
-"""
-
-# ===================== MAIN APP WITH CAMERA OPTION =====================
-
-main_app_html = """
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Application for Assessment of Quality of Textbook / Reference Books / E-Books</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1" />
-    <style>
-        :root{
-            --color-primary: #2563EB;
-            --color-accent: #22C55E;
-            --color-text: #0F172A;
-            --color-muted: #6B7280;
-            --color-bg-content: rgba(255,255,255,0.96);
-            --color-bg-page: #EFF6FF;
-            --color-warn: #EF4444;
-        }
-        *{ box-sizing:border-box; margin: 0; padding: 0; }
-        html, body { height:100%; }
-        body {
-            color: var(--color-text);
-            font-family: system-ui, -apple-system, BlinkMacSystemFont, "Inter", sans-serif;
-            background-color: var(--color-bg-page);
-            background-image: linear-gradient(to bottom right, #dbeafe, #eff6ff);
-            background-repeat: no-repeat;
-            background-size: cover;
-            background-position: center;
-            background-attachment: fixed;
-        }
-        .page { min-height: 100%; display: flex; flex-direction: column; }
-        header.topbar {
-            background-color: rgba(255, 255, 255, 0.95);
-            position: sticky; top: 0; z-index: 1000;
-            backdrop-filter: blur(6px);
-            border-bottom: 1px solid #E5E7EB;
-            display: flex; align-items: center; justify-content: space-between;
-            padding: 10px 20px;
-        }
-        .brand {
-            font-weight: 800; font-size: 16px; letter-spacing:.2px;
-            color: var(--color-primary);
-        }
-        .brand span {
-            display:block;
-            font-size: 11px;
-            font-weight:500;
-            color: var(--color-muted);
-        }
-        .header-actions {
-            display: flex;
-            gap: 10px;
-            align-items: center;
-        }
-        .action-btn {
-            border: none;
-            border-radius: 999px;
-            color: var(--color-primary);
-            font-weight:600;
-            padding: 6px 12px;
-            cursor:pointer;
-            font-size: 12px;
-            background-color: rgba(37, 99, 235, 0.1);
-            transition: background-color 0.2s, transform 0.1s;
-        }
-        .action-btn:hover {
-            transform: translateY(-1px);
-            background-color: rgba(37, 99, 235, 0.18);
-        }
-        .logout-btn {
-            border: none; border-radius: 999px; color:white; font-weight:600;
-            padding: 6px 12px; cursor:pointer; font-size: 12px;
-            background-color: var(--color-accent);
-            transition: background-color 0.2s, transform 0.1s;
-        }
-        .logout-btn:hover { transform: translateY(-1px); background-color: #16a34a; }
-
-        .hero {
-            text-align: center; color: #0b1120; padding: 32px 16px 20px;
-        }
-        .hero h1 {
-            font-size: 22px;
-            font-weight: 800;
-            margin-bottom: 6px;
-        }
-        .hero p {
-            font-size: 14px;
-            color: var(--color-muted);
-            max-width: 650px;
-            margin: 0 auto;
-        }
-
-        main { flex:1; padding: 10px; }
-        .content {
-            max-width: 780px; margin: 0 auto 24px;
-            background: var(--color-bg-content);
-            border-radius: 14px;
-            padding: 18px 18px 22px;
-            box-shadow: 0 5px 18px rgba(15, 23, 42, 0.12);
-            border: 1px solid #E5E7EB;
-        }
-        h1.title {
-            text-align: left; font-weight: 800; color: var(--color-primary);
-            font-size: 20px; margin: 0 0 12px 0;
-        }
-        .subtitle-main {
-            font-size: 13px;
-            color: var(--color-muted);
-            margin-bottom: 16px;
-        }
-
-        .file-wrap {
-            border-radius: 10px;
-            padding: 10px;
-            background-color: #F9FAFB;
-            border: 1px dashed #CBD5F5;
-            margin-bottom: 16px;
-        }
-        .file-wrap:focus-within {
-            background-color: #F3F4FF;
-            box-shadow: 0 6px 18px rgba(37, 99, 235, 0.05);
-        }
-        input[type="file"] {
-            width: 100%;
-            padding: 10px;
-            margin-bottom: 10px;
-            border-radius: 8px;
-            border: 2px solid var(--color-primary);
-            cursor: pointer;
-            font-size: 14px;
-            background-color: #fff;
-            transition: border-color .25s ease, box-shadow .25s ease, transform .2s ease;
-        }
-        input[type="file"]:hover {
-            border-color: var(--color-accent);
-            box-shadow: 0 0 6px rgba(37, 99, 235, 0.35);
-            transform: translateY(-1px);
-        }
-        input[type="file"]:focus,
-        input[type="file"]:focus-visible {
-            outline: none;
-            border-color: var(--color-accent);
-            box-shadow: 0 0 0 3px rgba(34, 197, 94, 0.3);
-            transform: translateY(-1px);
-        }
-
-        .hint {
-            font-size: 12px;
-            color: var(--color-muted);
-            margin-bottom: 10px;
-        }
-
-        .actions { display:flex; gap:10px; justify-content:flex-start; align-items:center; margin-top: 6px; flex-wrap: wrap; }
-        .btn {
-            border: none; border-radius: 6px; color:white; font-weight: 600; font-size: 14px;
-            padding: 8px 16px; cursor: pointer; min-width: 120px;
-            background-color: var(--color-primary);
-            transition: background-color 0.2s, transform 0.1s, box-shadow 0.2s;
-        }
-        .btn:hover {
-            transform: translateY(-1px);
-            box-shadow: 0 3px 8px rgba(15, 23, 42, 0.18);
-            background-color: #1d4ed8;
-        }
-        .btn.secondary {
-            background-color: #111827;
-        }
-        .btn.secondary:hover {
-            background-color: #020617;
-        }
-        .btn.outline {
-            background-color: transparent;
-            color: var(--color-primary);
-            border: 1px solid var(--color-primary);
-        }
-        .btn.outline:hover {
-            background-color: rgba(37, 99, 235, 0.06);
-        }
-
-        /* CAMERA SECTION */
-        .camera-wrap {
-            border-radius: 10px;
-            padding: 10px;
-            background-color: #F9FAFB;
-            border: 1px dashed #A7F3D0;
-        }
-        .camera-title {
-            font-size: 13px;
-            font-weight: 700;
-            color: var(--color-accent);
-            margin-bottom: 6px;
-        }
-        .camera-grid {
-            display: grid;
-            grid-template-columns: 1fr;
-            gap: 10px;
-        }
-        @media (min-width: 640px) {
-            .camera-grid {
-                grid-template-columns: 2fr 1fr;
-            }
-        }
-        .camera-preview-box {
-            background-color: #000;
-            border-radius: 8px;
-            overflow: hidden;
-            position: relative;
-            min-height: 200px;
-        }
-        video#cameraVideo, canvas#cameraCanvas {
-            width: 100%;
-            height: 100%;
-            object-fit: contain;
-            background-color: #000;
-        }
-        .camera-side {
-            font-size: 12px;
-            color: var(--color-muted);
-            display: flex;
-            flex-direction: column;
-            gap: 8px;
-        }
-        .camera-status {
-            font-size: 12px;
-            color: var(--color-muted);
-        }
-        .divider-or {
-            text-align: center;
-            font-size: 11px;
-            color: var(--color-muted);
-            text-transform: uppercase;
-            letter-spacing: 0.08em;
-            margin: 10px 0;
-        }
-
-        #result {
-            margin-top: 18px;
-            border-radius: 12px;
-            overflow: hidden;
-            opacity: 0;
-            transform: translateY(-8px);
-            transition: opacity .35s ease, transform .35s ease;
-        }
-        #result.show {
-            opacity: 1;
-            transform: translateY(0);
-        }
-        .result-card {
-            background: #ffffff;
-            border-radius: 12px;
-            border: 1px solid #E5E7EB;
-            padding: 16px 18px;
-            font-size: 14px;
-            color: var(--color-text);
-            box-shadow: 0 8px 20px rgba(15, 23, 42, 0.08);
-        }
-        .result-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 8px;
-            gap: 8px;
-            flex-wrap: wrap;
-        }
-        .result-pill {
-            display: inline-flex;
-            align-items: center;
-            gap: 6px;
-            padding: 3px 10px;
-            border-radius: 999px;
-            font-size: 12px;
-            font-weight: 600;
-            background: rgba(37, 99, 235, 0.08);
-            color: var(--color-primary);
-        }
-        .result-pill-dot {
-            width: 8px;
-            height: 8px;
-            border-radius: 999px;
-            background: var(--color-accent);
-        }
-        .result-time {
-            font-size: 11px;
-            color: var(--color-muted);
-        }
-        .result-title {
-            margin: 4px 0 6px 0;
-            font-size: 18px;
-            font-weight: 800;
-            color: var(--color-primary);
-        }
-        .result-subtitle {
-            font-size: 13px;
-            color: var(--color-muted);
-            margin-bottom: 10px;
-        }
-        .result-grid {
-            display: grid;
-            grid-template-columns: 1fr;
-            gap: 10px;
-        }
-        @media (min-width: 640px) {
-            .result-grid {
-                grid-template-columns: 1fr 1fr;
-            }
-        }
-        .result-section {
-            background: #F9FAFB;
-            border-radius: 10px;
-            padding: 8px 10px;
-            border: 1px solid #E5E7EB;
-        }
-        .result-section h3 {
-            font-size: 12px;
-            font-weight: 700;
-            margin-bottom: 4px;
-            text-transform: uppercase;
-            letter-spacing: .06em;
-            color: var(--color-muted);
-        }
-        .result-section p {
-            margin: 0;
-            font-size: 13px;
-            line-height: 1.5;
-        }
-        .result-note {
-            margin-top: 10px;
-            font-size: 12px;
-            color: var(--color-muted);
-            border-top: 1px dashed #E5E7EB;
-            padding-top: 6px;
-        }
-
-        .history-panel-overlay {
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            background: rgba(15, 23, 42, 0.6);
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            z-index: 2000;
-            opacity: 0;
-            visibility: hidden;
-            transition: opacity 0.25s, visibility 0.25s;
-        }
-        .history-panel-overlay.active {
-            opacity: 1;
-            visibility: visible;
-        }
-        .history-panel-content {
-            background: var(--color-bg-content);
-            border-radius: 12px;
-            padding: 22px;
-            width: 90%;
-            max-width: 520px;
-            max-height: 80vh;
-            overflow-y: auto;
-            box-shadow: 0 18px 40px rgba(15, 23, 42, 0.45);
-            position: relative;
-            transform: scale(0.94);
-            transition: transform 0.25s ease-out;
-        }
-        .history-panel-overlay.active .history-panel-content {
-            transform: scale(1);
-        }
-        .close-btn {
-            position: absolute;
-            top: 8px;
-            right: 12px;
-            background: none;
-            border: none;
-            font-size: 22px;
-            color: var(--color-muted);
-            cursor: pointer;
-            line-height: 1;
-            transition: color 0.2s;
-        }
-        .close-btn:hover {
-            color: var(--color-warn);
-        }
-        .history-title {
-            font-size: 18px;
-            margin-top: 0;
-            margin-bottom: 10px;
-            font-weight: 700;
-        }
-        .history-list {
-            list-style: none;
-            padding: 0;
-            margin: 0;
-        }
-        .history-item {
-            background-color: #F9FAFB;
-            border: 1px solid #E5E7EB;
-            border-left: 4px solid var(--color-accent);
-            border-radius: 8px;
-            padding: 10px 12px;
-            margin-bottom: 8px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            transition: transform 0.15s, box-shadow 0.15s;
-        }
-        .history-item:hover {
-            box-shadow: 0 4px 10px rgba(15, 23, 42, 0.08);
-            transform: translateY(-1px);
-        }
-        .history-details strong {
-            color: var(--color-text);
-            font-weight: 700;
-            font-size: 14px;
-        }
-        .history-time {
-            font-size: 11px;
-            color: var(--color-muted);
-            text-align: right;
-        }
-
-        footer.site {
-            margin-top: auto; padding: 10px 20px; text-align: center; color: var(--color-muted);
-            background-color: rgba(255, 255, 255, 0.9); border-top: 1px solid #E5E7EB;
-            font-size: 11px;
-        }
-    </style>
-</head>
-<body>
-    <div class="page">
-        <header class="topbar">
-            <div class="brand">
-              Application for Assessment of Quality of Textbook / Reference Books / E-Books
-              <span>Upload academic materials and obtain AI-assisted quality insights.</span>
-            </div>
-            <div class="header-actions">
-                <button id="history-toggle-btn" class="action-btn" title="View Previous Evaluations">History</button>
-                <a class="logout-btn" href="{{ url_for('logout') }}">Logout</a>
-            </div>
-        </header>
-        <section class="hero" role="banner" aria-label="Textbook quality assessment intro">
-            <h1>Evaluate Textbook & E-Book Quality in Minutes</h1>
-            <p>
-              Upload a PDF, Word document, text file, or a photo of a textbook page — either from your files
-              or directly using your device camera — to receive an AI-assisted review.
-            </p>
-        </section>
-        <main>
-            <div class="content">
-                <h1 class="title"><b>Textbook / Reference / E-Book Analyzer</b></h1>
-                <p class="subtitle-main">
-                    This tool provides a preliminary, automated assessment of educational material quality.
-                    Use the output as a supporting opinion, not as a replacement for expert academic review.
-                </p>
-
-                <!-- FILE UPLOAD SECTION -->
-                <div class="file-wrap">
-                  <form id="uploadForm" action="/analyze" method="post" enctype="multipart/form-data">
-                    <p class="hint">
-                        Supported formats: <b>PDF (.pdf)</b>, <b>Word (.docx)</b>, <b>Text (.txt)</b>,
-                        or <b>image files</b> of textbook pages.
-                    </p>
-                    <input type="file" id="fileInput" name="file"
-                           accept=".pdf,.docx,.txt,image/*"
-                           required><br>
-                    <div class="actions">
-                      <button class="btn" type="submit"><b>Analyze Uploaded File</b></button>
-                    </div>
-                  </form>
-                </div>
-
-                <div class="divider-or">or use integrated camera</div>
-
-                <!-- CAMERA CAPTURE SECTION -->
-                <div class="camera-wrap">
-                    <div class="camera-title">Capture a Textbook Page with Camera</div>
-                    <div class="camera-grid">
-                        <div class="camera-preview-box">
-                            <video id="cameraVideo" autoplay playsinline></video>
-                            <canvas id="cameraCanvas" style="display:none;"></canvas>
-                        </div>
-                        <div class="camera-side">
-                            <div class="hint">
-                                1. Click <b>Start Camera</b> and allow browser permission.<br>
-                                2. Hold the textbook page clearly in front of the camera.<br>
-                                3. Click <b>Capture Photo</b> and then <b>Analyze Photo</b>.
-                            </div>
-                            <div class="actions">
-                                <button id="cameraStartBtn" class="btn outline" type="button">Start Camera</button>
-                                <button id="cameraCaptureBtn" class="btn secondary" type="button">Capture Photo</button>
-                            </div>
-                            <div class="actions">
-                                <button id="cameraAnalyzeBtn" class="btn" type="button">Analyze Photo</button>
-                            </div>
-                            <div id="cameraStatus" class="camera-status">
-                                Camera not started. Click "Start Camera" to begin.
-                            </div>
-                        </div>
-                    </div>
-                </div>
-
-                <div id="result"></div>
-            </div>
-        </main>
-        <footer class="site">
-            <small>
-                This is a <b>supporting tool</b> for educational quality review. Always combine AI feedback
-                with judgment from qualified subject experts.
-            </small>
-        </footer>
-    </div>
-
-    <div id="history-panel" class="history-panel-overlay">
-        <div class="history-panel-content">
-            <button class="close-btn" onclick="toggleHistory(false)">×</button>
-            <div class="history-section">
-                <div class="history-title">Recent Evaluation History</div>
-                <ul class="history-list">
-                    <li class="history-item" style="justify-content: center; background-color: #FFF; color: var(--color-muted); border-left: none;">
-                        Click "History" to load your full evaluation history.
-                    </li>
-                </ul>
-            </div>
-        </div>
-    </div>
-
-    <script>
-    let historyLoadedOnce = false;
-
-    function toggleHistory(show) {
-        const panel = document.getElementById('history-panel');
-        if (show === undefined) {
-            panel.classList.toggle('active');
-        } else if (show) {
-            panel.classList.add('active');
-        } else {
-            panel.classList.remove('active');
-        }
-    }
-
-    async function loadHistory() {
-        const panel = document.getElementById('history-panel');
-        const list = panel.querySelector('.history-list');
-
-        toggleHistory(true);
-
-        list.innerHTML = `
-            <li class="history-item" style="justify-content: center; background-color: #FFF; color: var(--color-muted); border-left: none;">
-                Loading history...
-            </li>
-        `;
-
-        try {
-            const res = await fetch('/user_history', {
-                method: 'GET',
-                credentials: 'same-origin'
-            });
-
-            if (!res.ok) {
-                throw new Error('Server error: ' + res.status);
-            }
-
-            const data = await res.json();
-            const history = data.history || [];
-
-            if (!history.length) {
-                list.innerHTML = `
-                    <li class="history-item" style="justify-content: center; background-color: #FFF; color: var(--color-muted); border-left: none;">
-                        No previous evaluation history found.
-                    </li>
-                `;
-                return;
-            }
-
-            list.innerHTML = history.map(item => {
-                const timestamp = item.timestamp || '';
-                const datePart = timestamp.split(' ')[0] || '';
-                const overall = item.overall_rating || 'No rating';
-                const shortSummary = (item.summary || '').slice(0, 80);
-                const summaryDisplay = shortSummary ? shortSummary + (item.summary.length > 80 ? '…' : '') : 'No summary stored.';
-                return `
-                    <li class="history-item">
-                        <div class="history-details">
-                            <strong>${overall}</strong>
-                            <br>
-                            <small>${summaryDisplay}</small>
-                        </div>
-                        <div class="history-time">${datePart}</div>
-                    </li>
-                `;
-            }).join('');
-        } catch (err) {
-            console.error(err);
-            list.innerHTML = `
-                <li class="history-item" style="justify-content: center; background-color: #FFF; color: var(--color-warn); border-left: none;">
-                    Error loading history: ${err.message}
-                </li>
-            `;
-        }
-    }
-
-    const uploadForm = document.getElementById('uploadForm');
-    const resultBox = document.getElementById('result');
-
-    // Reusable function to call /analyze with any FormData (file upload OR camera)
-    async function analyzeFormData(fd, submitBtn) {
-      submitBtn.disabled = true;
-      const oldLabel = submitBtn.textContent;
-      submitBtn.textContent = 'Analyzing...';
-      resultBox.classList.remove('show');
-      resultBox.innerHTML = '';
-
-      try {
-        const res = await fetch('/analyze', {
-          method: 'POST',
-          body: fd,
-          credentials: 'same-origin'
-        });
-
-        let data = null;
-        try {
-          data = await res.json();
-        } catch (_) {
-          data = null;
-        }
-
-        if (!res.ok) {
-          const msg = (data && data.error) ? data.error : `Unexpected server error (${res.status})`;
-          throw new Error(msg);
-        }
-
-        const now = new Date().toLocaleString();
-
-        const accuracyScore = data.accuracy_score;
-        const readabilityScore = data.readability_score;
-        const consistencyScore = data.consistency_score;
-        const overallScore = data.overall_rating;
-
-        const accuracy = data.accuracy ?? 'Not available';
-        const readability = data.readability ?? 'Not available';
-        const consistency = data.consistency ?? 'Not available';
-        const summary = data.summary ?? 'Not available';
-
-        const overallDisplay = (overallScore !== undefined && overallScore !== null)
-          ? `${overallScore}/5`
-          : 'Not available';
-
-        const formatPercent = (val) => {
-          if (val === undefined || val === null || isNaN(val)) return 'N/A';
-          return `${val}%`;
-        };
-
-        resultBox.innerHTML = `
-          <div class="result-card">
-            <div class="result-header">
-              <div class="result-pill">
-                <span class="result-pill-dot"></span>
-                <span>AI Quality Evaluation</span>
-              </div>
-              <div class="result-time">${now}</div>
-            </div>
-
-            <h2 class="result-title">${overallDisplay}</h2>
-            <p class="result-subtitle">
-              This card summarizes the AI-assisted evaluation of the uploaded or captured textbook / reference / e-book content.
-            </p>
-
-            <div class="result-grid">
-              <div class="result-section">
-                <h3>Accuracy (${formatPercent(accuracyScore)})</h3>
-                <p>${accuracy}</p>
-              </div>
-              <div class="result-section">
-                <h3>Readability (${formatPercent(readabilityScore)})</h3>
-                <p>${readability}</p>
-              </div>
-              <div class="result-section">
-                <h3>Consistency (${formatPercent(consistencyScore)})</h3>
-                <p>${consistency}</p>
-              </div>
-              <div class="result-section">
-                <h3>Summary</h3>
-                <p>${summary}</p>
-              </div>
-            </div>
-
-            <p class="result-note">
-              This is a <strong>preliminary AI-based assessment</strong>, not a formal academic review.
-              Please combine these insights with evaluations by qualified subject-matter experts before making
-              publishing or curriculum decisions.
-            </p>
-          </div>
-        `;
-        resultBox.classList.add('show');
-        resultBox.scrollIntoView({ behavior: 'smooth', block: 'nearest' });
-
-      } catch (err) {
-        resultBox.innerHTML = `<p style="color:#EF4444; font-size:13px;"><strong>Error:</strong> ${err.message}</p>`;
-        resultBox.classList.add('show');
-      } finally {
-        submitBtn.disabled = false;
-        submitBtn.textContent = oldLabel;
-      }
-    }
-
-    // Handle normal file upload form
-    uploadForm.addEventListener('submit', async (e) => {
-      e.preventDefault();
-      const form = e.currentTarget;
-      const fd = new FormData(form);
-      const submitBtn = form.querySelector('button[type="submit"]');
-      await analyzeFormData(fd, submitBtn);
-    });
-
-    // CAMERA LOGIC
-    let cameraStream = null;
-    let capturedImageBlob = null;
-
-    const cameraVideo = document.getElementById('cameraVideo');
-    const cameraCanvas = document.getElementById('cameraCanvas');
-    const cameraStatus = document.getElementById('cameraStatus');
-    const cameraStartBtn = document.getElementById('cameraStartBtn');
-    const cameraCaptureBtn = document.getElementById('cameraCaptureBtn');
-    const cameraAnalyzeBtn = document.getElementById('cameraAnalyzeBtn');
-
-    cameraStartBtn.addEventListener('click', async () => {
-      try {
-        if (!navigator.mediaDevices || !navigator.mediaDevices.getUserMedia) {
-          cameraStatus.textContent = 'Camera not supported in this browser/device.';
-          return;
-        }
-        cameraStream = await navigator.mediaDevices.getUserMedia({ video: true });
-        cameraVideo.srcObject = cameraStream;
-        cameraVideo.style.display = 'block';
-        cameraCanvas.style.display = 'none';
-        cameraStatus.textContent = 'Camera is on. Position the page and click "Capture Photo".';
-      } catch (err) {
-        console.error(err);
-        cameraStatus.textContent = 'Unable to access camera: ' + err.message;
-      }
-    });
-
-    cameraCaptureBtn.addEventListener('click', () => {
-      if (!cameraStream) {
-        cameraStatus.textContent = 'Start camera first.';
-        return;
-      }
-      const trackSettings = cameraStream.getVideoTracks()[0].getSettings();
-      const width = trackSettings.width || 640;
-      const height = trackSettings.height || 480;
-
-      cameraCanvas.width = width;
-      cameraCanvas.height = height;
-      const ctx = cameraCanvas.getContext('2d');
-      ctx.drawImage(cameraVideo, 0, 0, width, height);
-
-      cameraCanvas.toBlob((blob) => {
-        if (!blob) {
-          cameraStatus.textContent = 'Failed to capture image from camera.';
-          return;
-        }
-        capturedImageBlob = blob;
-        cameraVideo.style.display = 'none';
-        cameraCanvas.style.display = 'block';
-        cameraStatus.textContent = 'Photo captured. Click "Analyze Photo" to evaluate.';
-      }, 'image/jpeg', 0.9);
-    });
-
-    cameraAnalyzeBtn.addEventListener('click', async () => {
-      if (!capturedImageBlob) {
-        cameraStatus.textContent = 'No captured photo found. Capture a photo first.';
-        return;
-      }
-      const fd = new FormData();
-      fd.append('file', capturedImageBlob, 'camera_capture.jpg');
-      await analyzeFormData(fd, cameraAnalyzeBtn);
-    });
-
-    // Stop camera when leaving page (optional)
-    window.addEventListener('beforeunload', () => {
-      if (cameraStream) {
-        cameraStream.getTracks().forEach(t => t.stop());
-      }
-    });
-
-    document.addEventListener('DOMContentLoaded', () => {
-      document.getElementById('history-toggle-btn').addEventListener('click', () => {
-        loadHistory();
-      });
-    });
-    </script>
-</body>
-</html>
-"""
-
-# ========================= Flask Routes ==========================
-
-@app.route("/login", methods=["GET", "POST"])
-def login():
-    if request.method == "POST":
-        username = request.form["username"]
-        password = request.form["password"]
-
-        user = users_collection.find_one({"username": username})
-        if user and check_password_hash(user.get("password_hash", ""), password):
-            session["logged_in"] = True
-            session["username"] = username
-            session["user_id"] = str(user["_id"])
-            return redirect(url_for("home"))
-
-        return render_template_string(login_html, error="Invalid credentials")
-
-    return render_template_string(login_html, message=request.args.get("message"))
-
-
-@app.route("/register", methods=["GET", "POST"])
-def register():
-    if request.method == "POST":
-        username = request.form["username"]
-        password = request.form["password"]
-
-        existing = users_collection.find_one({"username": username})
-        if existing:
-            return render_template_string(
-                register_html,
-                error="Username already exists. Please choose a different one.",
-            )
-
-        password_hash = generate_password_hash(password)
-
-        users_collection.insert_one({
-            "username": username,
-            "password_hash": password_hash,
-            "created_at": datetime.utcnow(),
-        })
-
-        return redirect(
-            url_for("login", message="Account created successfully! Please log in.")
-        )
-
-    return render_template_string(register_html)
-
-
-@app.route("/logout")
-def logout():
-    session.pop("logged_in", None)
-    session.pop("username", None)
-    session.pop("user_id", None)
-    return redirect(url_for("login"))
-
-
-@app.route("/")
-def home():
-    if "logged_in" not in session:
-        return redirect(url_for("login"))
-
-    return render_template_string(main_app_html)
-
-
-@app.route("/analyze", methods=["POST"])
-def analyze():
-    if "logged_in" not in session or "user_id" not in session:
-        return jsonify({"error": "Unauthorized"}), 401
-
-    if "file" not in request.files:
-        return jsonify({"error": "No file found in request"}), 400
-
-    file = request.files["file"]
-
-    if not file.filename:
-        # if file comes from camera blob, filename might be present but safe-guard:
-        filename = getattr(file, "filename", "") or "camera_capture.jpg"
-    else:
-        filename = file.filename
-
-    content_type = file.content_type or ""
-
-    try:
-        # Read bytes once
-        file_bytes = file.read()
-
-        # Store file in GridFS
-        file_id = files_fs.put(
-            file_bytes,
-            filename=filename,
-            content_type=content_type,
-            uploaded_at=datetime.utcnow(),
-            user_id=session["user_id"],
-        )
-
-        # Decide if it's an image or document
-        lower_name = filename.lower()
-        is_image = (
-            content_type.startswith("image/")
-            or lower_name.endswith((".png", ".jpg", ".jpeg", ".webp", ".bmp", ".gif"))
-        )
-
-        text_content = None
-        image_bytes = None
-        image_mime = None
-
-        if is_image:
-            image_bytes = file_bytes
-            image_mime = content_type if content_type.startswith("image/") else "image/jpeg"
-        else:
-            # Extract text from pdf/docx/txt
-            text_content = extract_text_from_file_bytes(filename, file_bytes)
-
-    except ValueError as ve:
-        return jsonify({"error": str(ve)}), 400
-    except Exception as e:
-        return jsonify({"error": f"Failed to process file: {e}"}), 400
-
-    evaluation_data = evaluate_textbook_gemini(
-        text_content=text_content or "",
-        image_bytes=image_bytes,
-        image_mime=image_mime,
-    )
-    if "error" in evaluation_data:
-        return jsonify(evaluation_data), 500
-
-    # Overall rating (string form for display)
-    overall_num = evaluation_data.get("overall_rating", None)
-    if isinstance(overall_num, (int, float)):
-        overall_str = f"{overall_num}/5"
-    else:
-        overall_str = str(overall_num) if overall_num is not None else "No rating"
-
-    # --- Save FULL evaluation document in MongoDB ---
-    input_type = "image" if image_bytes is not None else "document"
-    try:
-        eval_doc = {
-            "user_id": ObjectId(session["user_id"]),
-            "username": session.get("username"),
-            "timestamp": datetime.utcnow(),
-
-            "input_type": input_type,
-
-            # File info
-            "file_id": file_id,
-            "original_filename": filename,
-            "content_type": content_type,
-
-            # Scores
-            "accuracy_score": evaluation_data.get("accuracy_score"),
-            "readability_score": evaluation_data.get("readability_score"),
-            "consistency_score": evaluation_data.get("consistency_score"),
-
-            # Full explanation texts from analyzer
-            "accuracy_text": evaluation_data.get("accuracy", ""),
-            "readability_text": evaluation_data.get("readability", ""),
-            "consistency_text": evaluation_data.get("consistency", ""),
-
-            # Overall rating (numeric + string)
-            "overall_rating_value": evaluation_data.get("overall_rating"),
-            "overall_rating": overall_str,
-
-            # Summary text (full)
-            "summary": evaluation_data.get("summary", ""),
-
-            # Full extracted text from the uploaded document (if any)
-            "full_extracted_text": text_content if text_content else None,
-
-            # Raw JSON from Gemini
-            "raw_evaluation": evaluation_data,
-        }
-        evaluations_collection.insert_one(eval_doc)
-    except Exception as e:
-        print(f"Error saving evaluation to MongoDB: {e}")
-
-    # --- Response to frontend ---
-    return jsonify(
-        {
-            "accuracy_score": evaluation_data.get("accuracy_score"),
-            "accuracy": evaluation_data.get("accuracy", "AI analysis unavailable."),
-            "readability_score": evaluation_data.get("readability_score"),
-            "readability": evaluation_data.get(
-                "readability", "AI analysis unavailable."
-            ),
-            "consistency_score": evaluation_data.get("consistency_score"),
-            "consistency": evaluation_data.get(
-                "consistency", "AI analysis unavailable."
-            ),
-            "overall_rating": evaluation_data.get(
-                "overall_rating", "AI analysis unavailable."
-            ),
-            "summary": evaluation_data.get("summary", "AI analysis unavailable."),
-        }
-    )
-
-
-@app.route("/user_history", methods=["GET"])
-def user_history():
-    if "logged_in" not in session or "user_id" not in session:
-        return jsonify({"error": "Unauthorized"}), 401
-
-    try:
-        user_id = ObjectId(session["user_id"])
-    except Exception:
-        return jsonify({"history": []})
-
-    cursor = (
-        evaluations_collection
-        .find({"user_id": user_id})
-        .sort("timestamp", -1)
-        .limit(50)
-    )
-
-    history = []
-    for doc in cursor:
-        ts = doc.get("timestamp")
-        if isinstance(ts, datetime):
-            ts_str = ts.strftime("%Y-%m-%d %H:%M:%S")
-        else:
-            ts_str = str(ts) if ts else ""
-        history.append(
-            {
-                "timestamp": ts_str,
-                "overall_rating": doc.get("overall_rating", "No rating"),
-                "summary": doc.get("summary", ""),
-                "original_filename": doc.get("original_filename", ""),
-            }
-        )
-
-    return jsonify({"history": history})
-
-
-if __name__ == "__main__":
-    app.run(debug=True)
+# Project.py
+import os
+import io
+import gzip
+import json
+import asyncio
+import hashlib
+import shutil
+import tempfile
+import time
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+
+try:
+    import orjson                  # fast JSON parsing for Gemini responses
+except ImportError:
+    orjson = None
+
+try:
+    from PIL import Image          # for downscaling page photos
+except ImportError:
+    Image = None
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from flask import (
+    Flask,
+    Response,
+    request,
+    jsonify,
+    redirect,
+    url_for,
+    session,
+)
+
+import httpx
+
+from google import genai
+from google.genai import types
+
+try:
+    import fitz                    # PyMuPDF, for fast PDF text extraction
+except ImportError:
+    fitz = None
+
+from PyPDF2 import PdfReader       # PDF fallback when PyMuPDF is unavailable
+import docx                        # for DOCX
+
+# --- MongoDB Imports ---
+from pymongo import MongoClient, WriteConcern
+from bson.objectid import ObjectId
+from werkzeug.security import generate_password_hash, check_password_hash
+import gridfs
+
+# --- Flask Setup ---
+
+app = Flask(__name__)
+
+SECRET_KEY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".flask_secret")
+
+
+def _load_or_create_secret_key() -> str:
+    """
+    Returns the session secret key. Prefers FLASK_SECRET_KEY; otherwise
+    reuses a key persisted next to the app so sessions survive process
+    restarts instead of every user being logged out on each redeploy.
+    """
+    env_key = os.environ.get("FLASK_SECRET_KEY")
+    if env_key:
+        return env_key
+
+    try:
+        with open(SECRET_KEY_FILE) as f:
+            key = f.read().strip()
+        if key:
+            return key
+    except OSError:
+        pass
+
+    key = os.urandom(24).hex()
+    try:
+        fd = os.open(SECRET_KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(key)
+    except OSError as e:
+        print(f"WARNING: Could not persist session secret key: {e}")
+    return key
+
+
+app.secret_key = _load_or_create_secret_key()
+
+# Largest single request body we accept: covers one 8 MiB upload chunk and
+# any reasonable single-POST file, and lets Flask reject runaway uploads
+# with a 413 instead of buffering them.
+app.config["MAX_CONTENT_LENGTH"] = 32 * 1024 * 1024
+
+# --- MongoDB Setup ---
+
+MONGODB_URI = os.environ.get("MONGODB_URI", "mongodb://localhost:27017")
+MONGODB_DB_NAME = os.environ.get("MONGODB_DB_NAME", "textbook_quality_db")
+
+# Explicit pool sizing keeps concurrent requests from opening a fresh
+# socket each and bounds how long a request waits for a free connection.
+# w=1 acknowledges writes from the primary alone; nothing here needs to
+# wait on replica-set majority.
+mongo_client = MongoClient(
+    MONGODB_URI,
+    maxPoolSize=50,
+    minPoolSize=5,
+    waitQueueTimeoutMS=2000,
+    w=1,
+)
+mongo_db = mongo_client[MONGODB_DB_NAME]
+
+users_collection = mongo_db["users"]
+evaluations_collection = mongo_db["evaluations"]
+cached_evaluations_collection = mongo_db["cached_evaluations"]
+# Cold storage for the bulky per-evaluation payloads (extracted text, raw
+# model JSON), keyed by the evaluation's _id so the hot collection stays
+# small enough to scan and cache well.
+evaluation_blobs_collection = mongo_db["evaluation_blobs"]
+files_fs = gridfs.GridFS(mongo_db)  # for storing uploaded document binaries
+
+
+def _ensure_indexes() -> None:
+    """
+    Creates the indexes backing the hot-path queries: login lookup by
+    username, per-user history sorted by time, and the evaluation cache
+    key. create_index is idempotent, so running this on every boot is
+    safe; each index is attempted independently and failures are logged
+    rather than fatal — one refusing to build (say, the unique username
+    index over legacy duplicates) must not skip the rest, and the app
+    can still start while Mongo is briefly unreachable.
+    """
+    index_specs = [
+        (users_collection, "username", {"unique": True}),
+        (evaluations_collection, [("user_id", 1), ("timestamp", -1)], {}),
+        (evaluations_collection, "content_hash", {}),
+        (
+            cached_evaluations_collection,
+            [("hash", 1), ("model", 1), ("prompt_version", 1)],
+            {"unique": True},
+        ),
+        (mongo_db["fs.files"], "metadata.sha", {}),
+        (mongo_db["fs.files"], [("user_id", 1), ("uploaded_at", -1)], {}),
+    ]
+    for collection, keys, kwargs in index_specs:
+        try:
+            collection.create_index(keys, **kwargs)
+        except Exception as e:
+            print(f"WARNING: Could not create MongoDB index {keys!r}: {e}")
+
+
+_ensure_indexes()
+
+# --- Gemini API Setup ---
+
+GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "")
+GEMINI_MODEL = "gemini-2.5-flash"
+
+# Bump whenever the evaluation prompt or schema changes, so stale cached
+# evaluations are not served for the new prompt.
+PROMPT_VERSION = 1
+
+# Keep-alive connection pooling on the Gemini HTTP client avoids a new
+# TCP + TLS handshake on every evaluation call.
+GENAI_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+GENAI_HTTP_OPTIONS = types.HttpOptions(
+    client_args={"limits": GENAI_HTTP_LIMITS},
+    async_client_args={"limits": GENAI_HTTP_LIMITS},
+)
+
+try:
+    client = (
+        genai.Client(api_key=GEMINI_API_KEY, http_options=GENAI_HTTP_OPTIONS)
+        if GEMINI_API_KEY
+        else None
+    )
+    if client:
+        print("Gemini Client initialized successfully.")
+    else:
+        print("Gemini Client not initialized: GEMINI_API_KEY missing.")
+except Exception as e:
+    print(f"ERROR: Could not initialize Gemini Client. Error: {e}")
+    client = None
+
+# --- Gemini Schema and Evaluation Logic ---
+
+EVALUATION_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={
+        "accuracy_score": types.Schema(
+            type=types.Type.NUMBER,
+            description="Numerical score from 0 to 100 representing content accuracy."
+        ),
+        "accuracy": types.Schema(
+            type=types.Type.STRING,
+            description=(
+                "Short explanation/justification of the accuracy score, "
+                "commenting on factual correctness and domain alignment."
+            ),
+        ),
+        "readability_score": types.Schema(
+            type=types.Type.NUMBER,
+            description="Numerical score from 0 to 100 representing readability."
+        ),
+        "readability": types.Schema(
+            type=types.Type.STRING,
+            description=(
+                "Short explanation/justification of the readability score, "
+                "including clarity, structure, and ease of understanding."
+            ),
+        ),
+        "consistency_score": types.Schema(
+            type=types.Type.NUMBER,
+            description="Numerical score from 0 to 100 representing internal consistency."
+        ),
+        "consistency": types.Schema(
+            type=types.Type.STRING,
+            description=(
+                "Short explanation/justification of the consistency score, "
+                "commenting on terminology, notation, tone, and logical flow."
+            ),
+        ),
+        "overall_rating": types.Schema(
+            type=types.Type.NUMBER,
+            description=(
+                "Overall quality rating on a 0 to 5 scale. "
+                "You may use one decimal place (e.g., 4.3)."
+            ),
+        ),
+        "summary": types.Schema(
+            type=types.Type.STRING,
+            description=(
+                "2–4 sentence summary of the main strengths and weaknesses "
+                "of the material."
+            ),
+        ),
+    },
+    required=[
+        "accuracy_score",
+        "accuracy",
+        "readability_score",
+        "readability",
+        "consistency_score",
+        "consistency",
+        "overall_rating",
+        "summary",
+    ],
+)
+
+# Prompt and generation config are constant across requests, so build
+# them once at import time instead of on every evaluation call.
+EVALUATION_PROMPT = (
+    "You are an educational content quality reviewer. "
+    "You will be given either textual content or an image of textbook/reference book pages. "
+    "If an image is provided, read the text from the image first, then evaluate it.\n\n"
+    "Based only on the provided material (it may be partial), evaluate the content on:\n\n"
+    "1. Accuracy – Give a numerical score from 0 to 100 for factual correctness and "
+    "   alignment with standard knowledge in the field, and a short explanation.\n"
+    "2. Readability – Give a numerical score from 0 to 100 for clarity, structure, "
+    "   and ease of understanding, and a short explanation.\n"
+    "3. Consistency – Give a numerical score from 0 to 100 for internal consistency "
+    "   (terminology, notation, tone, logical flow), and a short explanation.\n"
+    "4. Overall Rating – Give one overall quality rating on a 0 to 5 scale "
+    "   (you may use one decimal place, e.g., 4.2).\n\n"
+    "Return your answer strictly using the provided JSON schema, filling:\n"
+    "- accuracy_score (0–100), accuracy (text explanation)\n"
+    "- readability_score (0–100), readability (text explanation)\n"
+    "- consistency_score (0–100), consistency (text explanation)\n"
+    "- overall_rating (0–5, number)\n"
+    "- summary (2–4 sentences summary).\n"
+)
+
+GENERATION_CONFIG = types.GenerateContentConfig(
+    response_mime_type="application/json",
+    response_schema=EVALUATION_SCHEMA,
+    temperature=0.0,
+)
+
+
+def _json_loads(payload):
+    """Parses JSON with orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def _json_dumps(obj):
+    """Serializes to JSON bytes with orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+# Page photos larger than this get re-encoded before the Gemini call;
+# 1600px on the long side is plenty for reading printed text.
+IMAGE_DOWNSCALE_THRESHOLD_BYTES = 400 * 1024
+IMAGE_MAX_DIMENSION = 1600
+IMAGE_JPEG_QUALITY = 82
+
+
+def _downscale_image(image_bytes: bytes, image_mime: str):
+    """
+    Re-encodes a large page photo to a bounded-size JPEG. Upload latency
+    and the model's vision preprocessing both scale with image bytes, so
+    shrinking multi-MB camera shots cuts the round-trip substantially.
+    Returns (bytes, mime); the original is passed through when Pillow is
+    unavailable, the image is already small, or re-encoding fails.
+    """
+    if Image is None or len(image_bytes) <= IMAGE_DOWNSCALE_THRESHOLD_BYTES:
+        return image_bytes, image_mime
+    try:
+        img = Image.open(io.BytesIO(image_bytes))
+        img.thumbnail((IMAGE_MAX_DIMENSION, IMAGE_MAX_DIMENSION))
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", quality=IMAGE_JPEG_QUALITY)
+    except Exception as e:
+        print(f"Image downscale failed, sending original: {e}")
+        return image_bytes, image_mime
+    return buffer.getvalue(), "image/jpeg"
+
+# ---------- Helper to extract text from non-image files ----------
+
+# Limit text size to avoid overloading the model (trim very long books)
+MAX_CHARS = 20000
+
+# Below this page count the thread-pool overhead outweighs the speedup.
+PARALLEL_MIN_PAGES = 8
+
+# If the opening pages of a PDF yield fewer stripped characters than
+# this, treat the file as a scanned-image PDF and stop early.
+SCANNED_PDF_PROBE_PAGES = 3
+SCANNED_PDF_MIN_TEXT_CHARS = 40
+
+# PDFs at least this large are parsed from a temp file path so MuPDF
+# reads pages from disk on demand (backed by the OS page cache) instead
+# of the whole blob being pinned in Python memory while it is parsed;
+# uploads over the threshold are copied to that file disk-to-disk and
+# never materialized as a bytes object at all.
+LARGE_PDF_SPOOL_BYTES = 20 * 1024 * 1024
+
+
+def _open_pdf(source):
+    """Opens a PDF for PyMuPDF from either a file path or a buffer."""
+    if isinstance(source, str):
+        return fitz.open(source)
+    return fitz.open(stream=source, filetype="pdf")
+
+# WordprocessingML tags for text runs and paragraphs inside a .docx
+_DOCX_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_DOCX_TEXT_TAG = _DOCX_NS + "t"
+_DOCX_PARA_TAG = _DOCX_NS + "p"
+
+
+def _extract_docx_text(raw_bytes) -> str:
+    """
+    Reads text runs straight out of word/document.xml with iterparse,
+    bypassing python-docx's full object model, and stops once MAX_CHARS
+    worth of text has been collected. Falls back to python-docx for
+    anything the fast path cannot read.
+    """
+    try:
+        with zipfile.ZipFile(io.BytesIO(raw_bytes)) as zf, \
+                zf.open("word/document.xml") as xml_stream:
+            paragraphs = []
+            runs = []
+            total = 0
+            for _, elem in ET.iterparse(xml_stream):
+                if elem.tag == _DOCX_TEXT_TAG and elem.text:
+                    runs.append(elem.text)
+                    total += len(elem.text)
+                elif elem.tag == _DOCX_PARA_TAG:
+                    paragraphs.append("".join(runs))
+                    runs = []
+                    if total >= MAX_CHARS:
+                        break
+                elem.clear()
+            if runs:
+                paragraphs.append("".join(runs))
+            return "\n".join(paragraphs)
+    except (zipfile.BadZipFile, KeyError, ET.ParseError):
+        doc = docx.Document(io.BytesIO(raw_bytes))
+        paragraphs = []
+        total = 0
+        for p in doc.paragraphs:
+            paragraphs.append(p.text)
+            total += len(p.text)
+            if total >= MAX_CHARS:
+                break
+        return "\n".join(paragraphs)
+
+
+def _extract_pdf_pages_parallel(source, page_count: int, start: int = 0) -> list:
+    """
+    Extracts PDF page text with a thread pool. PyMuPDF releases the GIL
+    inside MuPDF's C code, but a Document is not thread-safe, so each
+    worker thread opens its own view of the same source (buffer or temp
+    file path). Pages are dispatched in ordered batches so extraction
+    can still stop early once MAX_CHARS is reached.
+    """
+    local = threading.local()
+
+    def get_page_text(index: int) -> str:
+        doc = getattr(local, "doc", None)
+        if doc is None:
+            doc = _open_pdf(source)
+            local.doc = doc
+        try:
+            return doc.load_page(index).get_text("text") or ""
+        except Exception:
+            return ""
+
+    pages_text = []
+    total = 0
+    max_workers = os.cpu_count() or 1
+    batch_size = max_workers * 4
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for batch_start in range(start, page_count, batch_size):
+            batch = range(batch_start, min(batch_start + batch_size, page_count))
+            for page_text in pool.map(get_page_text, batch):
+                pages_text.append(page_text)
+                total += len(page_text)
+            if total >= MAX_CHARS:
+                break
+    return pages_text
+
+
+def _extract_pdf_text(source) -> str:
+    """
+    Extracts PDF text via PyMuPDF, with the PyPDF2 fallback path.
+    `source` may be a bytes-like buffer or a file path.
+    """
+    pages_text = []
+    total = 0
+    if fitz is not None:
+        tmp = None
+        if not isinstance(source, str) and len(source) >= LARGE_PDF_SPOOL_BYTES:
+            tmp = tempfile.NamedTemporaryFile(suffix=".pdf")
+            tmp.write(source)
+            tmp.flush()
+            source = tmp.name
+        try:
+            doc = _open_pdf(source)
+            page_count = doc.page_count
+            probe_count = min(SCANNED_PDF_PROBE_PAGES, page_count)
+
+            # Probe the opening pages first so a scanned-image PDF is
+            # rejected before the rest of the document is decompressed.
+            for index in range(probe_count):
+                try:
+                    page_text = doc.load_page(index).get_text("text") or ""
+                except Exception:
+                    page_text = ""
+                pages_text.append(page_text)
+                total += len(page_text)
+            if (
+                page_count > probe_count
+                and sum(len(t.strip()) for t in pages_text) < SCANNED_PDF_MIN_TEXT_CHARS
+            ):
+                doc.close()
+                raise ValueError(
+                    "This PDF appears to contain scanned page images with no "
+                    "extractable text. Please upload a text-based PDF, or "
+                    "photograph a page and upload it as an image instead."
+                )
+
+            if total < MAX_CHARS and page_count - probe_count >= PARALLEL_MIN_PAGES:
+                doc.close()
+                pages_text.extend(
+                    _extract_pdf_pages_parallel(source, page_count, start=probe_count)
+                )
+            else:
+                for index in range(probe_count, page_count):
+                    if total >= MAX_CHARS:
+                        # Enough text already; skip parsing the rest of the book.
+                        break
+                    try:
+                        page_text = doc.load_page(index).get_text("text") or ""
+                    except Exception:
+                        continue
+                    pages_text.append(page_text)
+                    total += len(page_text)
+                doc.close()
+        finally:
+            if tmp is not None:
+                tmp.close()
+    else:
+        reader = PdfReader(source if isinstance(source, str) else io.BytesIO(source))
+        for page in reader.pages:
+            try:
+                page_text = page.extract_text() or ""
+            except Exception:
+                continue
+            pages_text.append(page_text)
+            total += len(page_text)
+            if total >= MAX_CHARS:
+                break
+    return "\n".join(pages_text)
+
+
+def _extract_txt_text(raw_bytes) -> str:
+    # str() decodes any buffer object, not just bytes
+    return str(raw_bytes, "utf-8", "ignore")
+
+
+# O(1) extension dispatch; add new formats here instead of growing an
+# if/elif chain inside extract_text_from_file_bytes.
+_EXTRACTORS = {
+    ".pdf": _extract_pdf_text,
+    ".docx": _extract_docx_text,
+    ".txt": _extract_txt_text,
+}
+
+
+def _finalize_extracted_text(text: str) -> str:
+    """Clamps extracted text to MAX_CHARS and rejects empty results."""
+    if len(text) > MAX_CHARS:
+        text = text[:MAX_CHARS]
+
+    if not text.strip():
+        raise ValueError("No readable text found in the uploaded file.")
+
+    return text
+
+
+def extract_text_from_file_bytes(filename: str, raw_bytes) -> str:
+    """
+    Extracts text from the bytes of an uploaded file.
+    Supports PDF, DOCX and TXT. Images are handled separately.
+
+    `raw_bytes` may be any readable buffer (bytes, bytearray, memoryview):
+    the PyMuPDF path consumes it without copying, and the fallback
+    parsers go through BytesIO, which CPython shares copy-on-write for
+    immutable bytes.
+    """
+    ext = os.path.splitext(filename or "")[1].lower()
+    extractor = _EXTRACTORS.get(ext)
+    if extractor is None:
+        raise ValueError("Unsupported document type. Please upload PDF, DOCX, or TXT.")
+
+    return _finalize_extracted_text(extractor(raw_bytes))
+
+
+def extract_text_from_pdf_spool(spooled) -> str:
+    """
+    Extracts text from a spooled PDF upload without ever holding the
+    whole document as a bytes object: the spool is copied disk-to-disk
+    into a named temp file and the parser works from that path, reading
+    pages on demand.
+    """
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
+        spooled.seek(0)
+        shutil.copyfileobj(spooled, tmp)
+        tmp.flush()
+        return _finalize_extracted_text(_extract_pdf_text(tmp.name))
+
+
+# ---------- Gemini evaluation (text and/or image) ----------
+
+# Gemini bills per token and latency scales with input size, so clamp
+# the text payload to a token budget rather than trusting raw character
+# counts. ~4 chars/token is the usual estimate for English prose.
+CHARS_PER_TOKEN_ESTIMATE = 4
+MAX_INPUT_TOKENS = 6000
+
+
+def _trim_to_token_budget(text: str, max_tokens: int = MAX_INPUT_TOKENS) -> str:
+    """Clamps text to roughly max_tokens using the chars-per-token estimate."""
+    max_chars = max_tokens * CHARS_PER_TOKEN_ESTIMATE
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars]
+
+async def evaluate_textbook_gemini(
+    text_content: str | None = None,
+    image_bytes: bytes | None = None,
+    image_mime: str | None = None,
+):
+    """
+    Calls Gemini (via the async client) to evaluate either:
+      - pure text (pdf/doc/txt), or
+      - an image (photo of a page), or
+      - both together.
+    Returns a dict following EVALUATION_SCHEMA.
+    """
+    if client is None:
+        return {
+            "error": "Analysis Error: Gemini Client not initialized. Set GEMINI_API_KEY correctly."
+        }
+
+    if (not text_content or not text_content.strip()) and image_bytes is None:
+        return {"error": "No content to analyze."}
+
+    contents: list = [EVALUATION_PROMPT]
+
+    if text_content and text_content.strip():
+        contents.append(_trim_to_token_budget(text_content))
+
+    if image_bytes is not None:
+        mime = image_mime or "image/jpeg"
+        image_bytes, mime = _downscale_image(image_bytes, mime)
+        img_part = types.Part.from_bytes(data=image_bytes, mime_type=mime)
+        contents.append(img_part)
+
+    try:
+        # Stream the completion so the coroutine yields control between
+        # chunks instead of parking until the full response is generated.
+        parts = []
+        stream = await client.aio.models.generate_content_stream(
+            model=GEMINI_MODEL,
+            contents=contents,
+            config=GENERATION_CONFIG,
+        )
+        async for chunk in stream:
+            if chunk.text:
+                parts.append(chunk.text)
+        return _json_loads("".join(parts))
+    except Exception as e:
+        print(f"Gemini API call failed: {e}")
+        return {
+            "error": f"Analysis Error: API call failed or returned invalid data. Details: {e}"
+        }
+
+
+# ---------- Evaluation cache (content-addressed) ----------
+
+def lookup_cached_evaluation(content_hash: str):
+    """Returns a previously stored evaluation for this content, or None."""
+    try:
+        doc = cached_evaluations_collection.find_one({
+            "hash": content_hash,
+            "model": GEMINI_MODEL,
+            "prompt_version": PROMPT_VERSION,
+        })
+    except Exception as e:
+        print(f"Evaluation cache lookup failed: {e}")
+        return None
+    return doc.get("evaluation") if doc else None
+
+
+def store_cached_evaluation(content_hash: str, evaluation_data: dict) -> None:
+    """Stores a successful evaluation so identical uploads skip Gemini."""
+    try:
+        cached_evaluations_collection.insert_one({
+            "hash": content_hash,
+            "model": GEMINI_MODEL,
+            "prompt_version": PROMPT_VERSION,
+            "evaluation": evaluation_data,
+            "created_at": datetime.utcnow(),
+        })
+    except Exception as e:
+        print(f"Error saving evaluation cache entry: {e}")
+
+
+# TXT uploads up to this size skip GridFS entirely; their full text is
+# already stored inline on the evaluation document.
+SMALL_TXT_INLINE_BYTES = 4 * 1024
+
+# Upload spooling: payloads stay in memory below this threshold and
+# spill to a temp file above it, so a multi-MB upload is never held as
+# one extra bytes object just to be hashed and chunked into GridFS.
+UPLOAD_SPOOL_MAX_MEMORY = 1 * 1024 * 1024
+UPLOAD_CHUNK_BYTES = 64 * 1024
+
+# GridFS defaults to 255 KiB chunks; multi-MB textbook PDFs then cost a
+# long tail of small inserts. 4 MiB keeps the insert count low for the
+# file sizes this app sees — re-benchmark before changing it.
+GRIDFS_CHUNK_SIZE_BYTES = 4 * 1024 * 1024
+
+
+def _spool_upload(stream):
+    """
+    Copies an incoming upload stream chunk-by-chunk into a
+    SpooledTemporaryFile, feeding the content hash along the way.
+    Returns (content_hash, spooled_file, size); the caller owns and
+    must close the file.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    spooled = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_MEMORY)
+    size = 0
+    while True:
+        chunk = stream.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        hasher.update(chunk)
+        spooled.write(chunk)
+        size += len(chunk)
+    spooled.seek(0)
+    return hasher.hexdigest(), spooled, size
+
+
+def store_upload_in_gridfs(spooled, filename, content_type, user_id, content_hash, size):
+    """
+    Stores a spooled upload in GridFS unless an identical file (same
+    content hash) already exists, in which case the existing id is
+    reused instead of writing a duplicate copy. GridFS chunks the
+    file-like object itself, so no whole-file bytes object is built.
+    Tiny TXT files are not stored at all. Returns the GridFS id, or
+    None when nothing was stored.
+    """
+    if filename.lower().endswith(".txt") and size <= SMALL_TXT_INLINE_BYTES:
+        return None
+
+    existing = mongo_db["fs.files"].find_one(
+        {"metadata.sha": content_hash}, {"_id": 1}
+    )
+    if existing:
+        return existing["_id"]
+
+    spooled.seek(0)
+    return files_fs.put(
+        spooled,
+        filename=filename,
+        content_type=content_type,
+        uploaded_at=datetime.utcnow(),
+        user_id=user_id,
+        chunk_size=GRIDFS_CHUNK_SIZE_BYTES,
+        metadata={"sha": content_hash},
+    )
+
+
+# ===================== Flask Template Strings =====================
+
+login_html = """
+<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="UTF-8" />
+  <title>Textbook Quality Assessment — Login</title>
+  <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+  <link rel="preconnect" href="https://fonts.googleapis.com">
+  <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+  <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700&display=swap" rel="stylesheet">
+  <style>
+    :root{
+      --color-primary: #2563EB;
+      --color-accent: #22C55E;
+      --color-bg-start: #0f172a;
+      --color-bg-end: #1d4ed8;
+      --color-card: #FFFFFF;
+      --color-text: #111827;
+      --color-warn: #DC2626;
+    }
+    *{ box-sizing:border-box; margin: 0; padding: 0; }
+    body{
+      min-height:100vh; color:var(--color-text);
+      font-family: 'Inter', sans-serif;
+      background: radial-gradient(circle at top, var(--color-bg-end), var(--color-bg-start));
+      display:flex; justify-content:center; align-items:center;
+      padding: 20px;
+      background-color: #e5e7eb;
+    }
+    .card-container {
+        opacity: 0;
+        transform: translateY(20px);
+        animation: fadeIn 0.5s ease-out forwards;
+        animation-delay: 0.2s;
+        width: 100%;
+        max-width: 380px;
+    }
+    @keyframes fadeIn {
+        to {
+            opacity: 1;
+            transform: translateY(0);
+        }
+    }
+    .card{
+      background: var(--color-card);
+      border-radius: 12px;
+      box-shadow: 0 10px 30px rgba(0,0,0,0.1), 0 0 0 1px rgba(0,0,0,0.05);
+      padding: 35px;
+      width: 100%;
+      transition: all 0.3s ease;
+      border-top: 5px solid var(--color-primary);
+    }
+    .head{ text-align: center; margin-bottom: 25px; }
+    .title-wrapper {
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        gap: 10px;
+        margin-bottom: 5px;
+        transition: all 0.3s ease;
+    }
+    .title-wrapper:hover{
+        transform: scale(1.05);
+        transition: all 0.3s ease;
+    }
+    .title{
+        font-size: 24px; font-weight: 800; color: var(--color-primary);
+        letter-spacing: -0.5px;
+    }
+    .subtitle{ color: var(--color-text); font-size: 13px; opacity: 0.75; }
+    .field{ margin-bottom: 20px; }
+    label{ display: block; font-size: 14px; margin-bottom: 6px; font-weight: 600; color: var(--color-text); }
+    .input{
+      width: 100%; padding: 12px; border: 1px solid #D1D5DB; border-radius: 8px;
+      font-size: 16px; transition: border-color 0.3s, box-shadow 0.3s;
+      background-color: #F9FAFB;
+    }
+    .input:focus{
+        border-color: var(--color-primary);
+        outline: none;
+        box-shadow: 0 0 0 4px rgba(37, 99, 235, 0.25);
+    }
+    .actions{ display: flex; justify-content: space-between; gap: 15px; margin-top: 25px; }
+    .btn{
+      flex: 1; border: none; border-radius: 8px; color: white; font-weight: 700;
+      padding: 12px 15px; cursor: pointer; font-size: 15px;
+      transition: background-color 0.3s, transform 0.1s, box-shadow 0.3s;
+      box-shadow: 0 4px 6px rgba(0, 0, 0, 0.08);
+    }
+    .btn:active {
+        transform: translateY(1px);
+        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.08);
+    }
+    .btn.primary{ background-color: var(--color-primary); }
+    .btn.primary:hover{ background-color: #1d4ed8; }
+    .btn.alt{ background-color: var(--color-accent); }
+    .btn.alt:hover{ background-color: #16a34a; }
+    .error{ color: var(--color-warn); text-align: center; margin-top: 15px; font-size: 13px; font-weight: 600; }
+    .message{ color: var(--color-accent); text-align: center; margin-top: 15px; font-size: 13px; font-weight: 600; }
+    .login-form:hover {
+        transform: scale(1.02);
+        transition: all 0.4s ease;
+    }
+  </style>
+</head>
+<body>
+  <div class="card-container">
+    <main class="card" role="main">
+      <header class="head">
+        <div class="title-wrapper">
+            <!-- Inline SVGs (Lucide subset) avoid loading the full icon bundle -->
+            <svg xmlns="http://www.w3.org/2000/svg" width="26" height="26" viewBox="0 0 24 24" fill="none" stroke="var(--color-primary)" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" aria-hidden="true"><path d="M12 21V7"/><path d="m16 12 2 2 4-4"/><path d="M22 6V4a1 1 0 0 0-1-1h-5a4 4 0 0 0-4 4 4 4 0 0 0-4-4H3a1 1 0 0 0-1 1v13a1 1 0 0 0 1 1h6a3 3 0 0 1 3 3 3 3 0 0 1 3-3h6a1 1 0 0 0 1-1v-2"/></svg>
+            <div class="title">TEXTBOOK QUALITY APP</div>
+            <svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="var(--color-accent)" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" aria-hidden="true"><polygon points="12 2 15.09 8.26 22 9.27 17 14.14 18.18 21.02 12 17.77 5.82 21.02 7 14.14 2 9.27 8.91 8.26 12 2"/></svg>
+        </div>
+        <div class="subtitle">Sign in to assess textbooks, reference books, and e-books.</div>
+      </header>
+      {% if message %}<p class="message">{{ message }}</p>{% endif %}
+      {% if error %}<p class="error" role="alert">{{ error }}</p>{% endif %}
+      <form action="{{ url_for('login') }}" method="post" autocomplete="on" class="login-form">
+        <div class="field">
+          <label for="username">Email or User ID</label>
+          <input id="username" class="input" type="text" name="username" placeholder="e.g., reviewer@university.edu" required/>
+        </div>
+        <div class="field">
+          <label for="password">Password</label>
+          <input id="password" class="input" type="password" name="password" placeholder="••••••••" required/>
+        </div>
+        <div class="actions">
+          <button type="submit" class="btn primary">Login</button>
+          <button type="button" class="btn alt" onclick="window.location.href = '{{ url_for('register') }}'">Sign Up</button>
+        </div>
+      </form>
+    </main>
+  </div>
+</body>
+</html>
+"""
+
+register_html = """
+<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="UTF-8" />
+  <title>Textbook Quality Assessment — Registration</title>
+  <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+  <link rel="preconnect" href="https://fonts.googleapis.com">
+  <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+  <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700&display=swap" rel="stylesheet">
+  <style>
+    :root{
+      --color-primary: #2563EB;
+      --color-accent: #22C55E;
+      --color-bg-start: #f1f5f9;
+      --color-bg-end: #e5e7eb;
+      --color-card: #FFFFFF;
+      --color-text: #111827;
+      --color-warn: #DC2626;
+    }
+    *{ box-sizing:border-box; margin: 0; padding: 0; }
+    body{
+      min-height:100vh; color:var(--color-text);
+      font-family: 'Inter', sans-serif;
+      background: linear-gradient(135deg, var(--color-bg-start) 0%, var(--color-bg-end) 100%);
+      display:flex; justify-content:center; align-items:center;
+      padding: 20px;
+    }
+    .card-container {
+        opacity: 0;
+        transform: translateY(20px);
+        animation: fadeIn 0.5s ease-out forwards;
+        animation-delay: 0.2s;
+        width: 100%;
+        max-width: 420px;
+    }
+    @keyframes fadeIn {
+        to {
+            opacity: 1;
+            transform: translateY(0);
+        }
+    }
+    .card{
+      background: var(--color-card);
+      border-radius: 12px;
+      box-shadow: 0 10px 30px rgba(0,0,0,0.08), 0 0 0 1px rgba(0,0,0,0.04);
+      padding: 35px;
+      width: 100%;
+      transition: all 0.3s ease;
+      border-top: 5px solid var(--color-accent);
+    }
+    .head{ text-align: center; margin-bottom: 25px; }
+    .title-wrapper {
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        gap: 10px;
+        margin-bottom: 5px;
+        transition: all 0.3s ease;
+    }
+    .title{
+        font-size: 24px; font-weight: 800; color: var(--color-accent);
+        letter-spacing: -0.5px;
+    }
+    .subtitle{ color: var(--color-text); font-size: 13px; opacity: 0.75; }
+    .field{ margin-bottom: 20px; }
+    label{ display: block; font-size: 14px; margin-bottom: 6px; font-weight: 600; color: var(--color-text); }
+    .input{
+      width: 100%; padding: 12px; border: 1px solid #D1D5DB; border-radius: 8px;
+      font-size: 16px; transition: border-color 0.3s, box-shadow 0.3s;
+      background-color: #F9FAFB;
+    }
+    .input:focus{
+        border-color: var(--color-accent);
+        outline: none;
+        box-shadow: 0 0 0 4px rgba(34, 197, 94, 0.2);
+    }
+    .actions{ display: flex; justify-content: space-between; gap: 15px; margin-top: 25px; }
+    .btn{
+      flex: 1; border: none; border-radius: 8px; color: white; font-weight: 700;
+      padding: 12px 15px; cursor: pointer; font-size: 15px;
+      transition: background-color 0.3s, transform 0.1s, box-shadow 0.3s;
+      box-shadow: 0 4px 6px rgba(0, 0, 0, 0.08);
+    }
+    .btn:active {
+        transform: translateY(1px);
+        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.08);
+    }
+    .btn.primary{ background-color: var(--color-accent); }
+    .btn.primary:hover{ background-color: #16a34a; }
+    .btn.alt{ background-color: var(--color-primary); }
+    .btn.alt:hover{ background-color: #1d4ed8; }
+    .error{ color: var(--color-warn); text-align: center; margin-top: 15px; font-size: 13px; font-weight: 600; }
+    .message{ color: var(--color-accent); text-align: center; margin-top: 15px; font-size: 13px; font-weight: 600; }
+  </style>
+</head>
+<body>
+  <div class="card-container">
+    <main class="card" role="main">
+      <header class="head">
+        <div class="title-wrapper">
+            <!-- Inline SVGs (Lucide subset) avoid loading the full icon bundle -->
+            <svg xmlns="http://www.w3.org/2000/svg" width="26" height="26" viewBox="0 0 24 24" fill="none" stroke="var(--color-accent)" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" aria-hidden="true"><path d="M16 21v-2a4 4 0 0 0-4-4H6a4 4 0 0 0-4 4v2"/><circle cx="9" cy="7" r="4"/><line x1="19" x2="19" y1="8" y2="14"/><line x1="22" x2="16" y1="11" y2="11"/></svg>
+            <div class="title">CREATE REVIEWER ACCOUNT</div>
+            <svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="var(--color-primary)" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" aria-hidden="true"><path d="M20 13c0 5-3.5 7.5-7.66 8.95a1 1 0 0 1-.67-.01C7.5 20.5 4 18 4 13V6a1 1 0 0 1 1-1c2 0 4.5-1.2 6.24-2.72a1 1 0 0 1 1.52 0C14.51 3.81 17 5 19 5a1 1 0 0 1 1 1z"/><path d="m9 12 2 2 4-4"/></svg>
+        </div>
+        <div class="subtitle">Register to assess the quality of textbooks and e-resources.</div>
+      </header>
+      {% if message %}<p class="message">{{ message }}</p>{% endif %}
+      {% if error %}<p class="error" role="alert">{{ error }}</p>{% endif %}
+      <form action="{{ url_for('register') }}" method="post" autocomplete="on">
+        <div class="field">
+          <label for="username">Username</label>
+          <input id="username" class="input" type="text" name="username" placeholder="Choose a username" required/>
+        </div>
+        <div class="field">
+          <label for="password">Password</label>
+          <input id="password" class="input" type="password" name="password" placeholder="Create a strong password" required/>
+        </div>
+        <div class="actions">
+          <button type="submit" class="btn primary">Register Account</button>
+          <button type="button" class="btn alt" onclick="window.location.href = '{{ url_for('login') }}'">Back to Login</button>
+        </div>
+      </form>
+    </main>
+  </div>
+</body>
+</html>
+"""
+
+# Pre-compile the auth templates once at import; render_template_string
+# would re-lex and re-parse the full template source on every request.
+LOGIN_TMPL = app.jinja_env.from_string(login_html)
+REGISTER_TMPL = app.jinja_env.from_string(register_html)
+
+# ===================== MAIN APP WITH CAMERA OPTION =====================
+
+main_app_html = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Application for Assessment of Quality of Textbook / Reference Books / E-Books</title>
+    <meta name="viewport" content="width=device-width, initial-scale=1" />
+    <!-- The API is same-origin, so there is no extra handshake to
+         preconnect; warming /user_history instead means the first panel
+         open is served from the preload cache. -->
+    <link rel="preload" href="/user_history" as="fetch" crossorigin>
+    <style>
+        :root{
+            --color-primary: #2563EB;
+            --color-accent: #22C55E;
+            --color-text: #0F172A;
+            --color-muted: #6B7280;
+            --color-bg-content: rgba(255,255,255,0.96);
+            --color-bg-page: #EFF6FF;
+            --color-warn: #EF4444;
+        }
+        *{ box-sizing:border-box; margin: 0; padding: 0; }
+        html, body { height:100%; }
+        body {
+            color: var(--color-text);
+            font-family: system-ui, -apple-system, BlinkMacSystemFont, "Inter", sans-serif;
+            background-color: var(--color-bg-page);
+            background-image: linear-gradient(to bottom right, #dbeafe, #eff6ff);
+            background-repeat: no-repeat;
+            background-size: cover;
+            background-position: center;
+            background-attachment: fixed;
+        }
+        .page { min-height: 100%; display: flex; flex-direction: column; }
+        header.topbar {
+            background-color: rgba(255, 255, 255, 0.95);
+            position: sticky; top: 0; z-index: 1000;
+            backdrop-filter: blur(6px);
+            border-bottom: 1px solid #E5E7EB;
+            display: flex; align-items: center; justify-content: space-between;
+            padding: 10px 20px;
+        }
+        .brand {
+            font-weight: 800; font-size: 16px; letter-spacing:.2px;
+            color: var(--color-primary);
+        }
+        .brand span {
+            display:block;
+            font-size: 11px;
+            font-weight:500;
+            color: var(--color-muted);
+        }
+        .header-actions {
+            display: flex;
+            gap: 10px;
+            align-items: center;
+        }
+        .action-btn {
+            border: none;
+            border-radius: 999px;
+            color: var(--color-primary);
+            font-weight:600;
+            padding: 6px 12px;
+            cursor:pointer;
+            font-size: 12px;
+            background-color: rgba(37, 99, 235, 0.1);
+            transition: background-color 0.2s, transform 0.1s;
+        }
+        .action-btn:hover {
+            transform: translateY(-1px);
+            background-color: rgba(37, 99, 235, 0.18);
+        }
+        .logout-btn {
+            border: none; border-radius: 999px; color:white; font-weight:600;
+            padding: 6px 12px; cursor:pointer; font-size: 12px;
+            background-color: var(--color-accent);
+            transition: background-color 0.2s, transform 0.1s;
+        }
+        .logout-btn:hover { transform: translateY(-1px); background-color: #16a34a; }
+
+        .hero {
+            text-align: center; color: #0b1120; padding: 32px 16px 20px;
+        }
+        .hero h1 {
+            font-size: 22px;
+            font-weight: 800;
+            margin-bottom: 6px;
+        }
+        .hero p {
+            font-size: 14px;
+            color: var(--color-muted);
+            max-width: 650px;
+            margin: 0 auto;
+        }
+
+        main { flex:1; padding: 10px; }
+        .content {
+            max-width: 780px; margin: 0 auto 24px;
+            background: var(--color-bg-content);
+            border-radius: 14px;
+            padding: 18px 18px 22px;
+            box-shadow: 0 5px 18px rgba(15, 23, 42, 0.12);
+            border: 1px solid #E5E7EB;
+        }
+        h1.title {
+            text-align: left; font-weight: 800; color: var(--color-primary);
+            font-size: 20px; margin: 0 0 12px 0;
+        }
+        .subtitle-main {
+            font-size: 13px;
+            color: var(--color-muted);
+            margin-bottom: 16px;
+        }
+
+        .file-wrap {
+            border-radius: 10px;
+            padding: 10px;
+            background-color: #F9FAFB;
+            border: 1px dashed #CBD5F5;
+            margin-bottom: 16px;
+        }
+        .file-wrap:focus-within {
+            background-color: #F3F4FF;
+            box-shadow: 0 6px 18px rgba(37, 99, 235, 0.05);
+        }
+        input[type="file"] {
+            width: 100%;
+            padding: 10px;
+            margin-bottom: 10px;
+            border-radius: 8px;
+            border: 2px solid var(--color-primary);
+            cursor: pointer;
+            font-size: 14px;
+            background-color: #fff;
+            transition: border-color .25s ease, box-shadow .25s ease, transform .2s ease;
+        }
+        input[type="file"]:hover {
+            border-color: var(--color-accent);
+            box-shadow: 0 0 6px rgba(37, 99, 235, 0.35);
+            transform: translateY(-1px);
+        }
+        input[type="file"]:focus,
+        input[type="file"]:focus-visible {
+            outline: none;
+            border-color: var(--color-accent);
+            box-shadow: 0 0 0 3px rgba(34, 197, 94, 0.3);
+            transform: translateY(-1px);
+        }
+
+        .hint {
+            font-size: 12px;
+            color: var(--color-muted);
+            margin-bottom: 10px;
+        }
+
+        .actions { display:flex; gap:10px; justify-content:flex-start; align-items:center; margin-top: 6px; flex-wrap: wrap; }
+        .btn {
+            border: none; border-radius: 6px; color:white; font-weight: 600; font-size: 14px;
+            padding: 8px 16px; cursor: pointer; min-width: 120px;
+            background-color: var(--color-primary);
+            transition: background-color 0.2s, transform 0.1s, box-shadow 0.2s;
+        }
+        .btn:hover {
+            transform: translateY(-1px);
+            box-shadow: 0 3px 8px rgba(15, 23, 42, 0.18);
+            background-color: #1d4ed8;
+        }
+        .btn.secondary {
+            background-color: #111827;
+        }
+        .btn.secondary:hover {
+            background-color: #020617;
+        }
+        .btn.outline {
+            background-color: transparent;
+            color: var(--color-primary);
+            border: 1px solid var(--color-primary);
+        }
+        .btn.outline:hover {
+            background-color: rgba(37, 99, 235, 0.06);
+        }
+
+        /* CAMERA SECTION */
+        .camera-wrap {
+            border-radius: 10px;
+            padding: 10px;
+            background-color: #F9FAFB;
+            border: 1px dashed #A7F3D0;
+        }
+        .camera-title {
+            font-size: 13px;
+            font-weight: 700;
+            color: var(--color-accent);
+            margin-bottom: 6px;
+        }
+        .camera-grid {
+            display: grid;
+            grid-template-columns: 1fr;
+            gap: 10px;
+        }
+        @media (min-width: 640px) {
+            .camera-grid {
+                grid-template-columns: 2fr 1fr;
+            }
+        }
+        .camera-preview-box {
+            background-color: #000;
+            border-radius: 8px;
+            overflow: hidden;
+            position: relative;
+            min-height: 200px;
+        }
+        video#cameraVideo, canvas#cameraCanvas {
+            width: 100%;
+            height: 100%;
+            object-fit: contain;
+            background-color: #000;
+        }
+        .camera-side {
+            font-size: 12px;
+            color: var(--color-muted);
+            display: flex;
+            flex-direction: column;
+            gap: 8px;
+        }
+        .camera-status {
+            font-size: 12px;
+            color: var(--color-muted);
+        }
+        .divider-or {
+            text-align: center;
+            font-size: 11px;
+            color: var(--color-muted);
+            text-transform: uppercase;
+            letter-spacing: 0.08em;
+            margin: 10px 0;
+        }
+
+        #result {
+            margin-top: 18px;
+            border-radius: 12px;
+            overflow: hidden;
+            opacity: 0;
+            transform: translateY(-8px);
+            transition: opacity .35s ease, transform .35s ease;
+        }
+        #result.show {
+            opacity: 1;
+            transform: translateY(0);
+        }
+        .result-card {
+            background: #ffffff;
+            border-radius: 12px;
+            border: 1px solid #E5E7EB;
+            padding: 16px 18px;
+            font-size: 14px;
+            color: var(--color-text);
+            box-shadow: 0 8px 20px rgba(15, 23, 42, 0.08);
+        }
+        .result-header {
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+            margin-bottom: 8px;
+            gap: 8px;
+            flex-wrap: wrap;
+        }
+        .result-pill {
+            display: inline-flex;
+            align-items: center;
+            gap: 6px;
+            padding: 3px 10px;
+            border-radius: 999px;
+            font-size: 12px;
+            font-weight: 600;
+            background: rgba(37, 99, 235, 0.08);
+            color: var(--color-primary);
+        }
+        .result-pill-dot {
+            width: 8px;
+            height: 8px;
+            border-radius: 999px;
+            background: var(--color-accent);
+        }
+        .result-time {
+            font-size: 11px;
+            color: var(--color-muted);
+        }
+        .result-title {
+            margin: 4px 0 6px 0;
+            font-size: 18px;
+            font-weight: 800;
+            color: var(--color-primary);
+        }
+        .result-subtitle {
+            font-size: 13px;
+            color: var(--color-muted);
+            margin-bottom: 10px;
+        }
+        .result-grid {
+            display: grid;
+            grid-template-columns: 1fr;
+            gap: 10px;
+        }
+        @media (min-width: 640px) {
+            .result-grid {
+                grid-template-columns: 1fr 1fr;
+            }
+        }
+        .result-section {
+            background: #F9FAFB;
+            border-radius: 10px;
+            padding: 8px 10px;
+            border: 1px solid #E5E7EB;
+        }
+        .result-section h3 {
+            font-size: 12px;
+            font-weight: 700;
+            margin-bottom: 4px;
+            text-transform: uppercase;
+            letter-spacing: .06em;
+            color: var(--color-muted);
+        }
+        .result-section p {
+            margin: 0;
+            font-size: 13px;
+            line-height: 1.5;
+        }
+        .result-note {
+            margin-top: 10px;
+            font-size: 12px;
+            color: var(--color-muted);
+            border-top: 1px dashed #E5E7EB;
+            padding-top: 6px;
+        }
+
+        .history-panel-overlay {
+            position: fixed;
+            top: 0;
+            left: 0;
+            width: 100%;
+            height: 100%;
+            background: rgba(15, 23, 42, 0.6);
+            display: flex;
+            justify-content: center;
+            align-items: center;
+            z-index: 2000;
+            opacity: 0;
+            visibility: hidden;
+            transition: opacity 0.25s, visibility 0.25s;
+        }
+        .history-panel-overlay.active {
+            opacity: 1;
+            visibility: visible;
+        }
+        .history-panel-content {
+            background: var(--color-bg-content);
+            border-radius: 12px;
+            padding: 22px;
+            width: 90%;
+            max-width: 520px;
+            max-height: 80vh;
+            overflow-y: auto;
+            box-shadow: 0 18px 40px rgba(15, 23, 42, 0.45);
+            position: relative;
+            transform: scale(0.94);
+            transition: transform 0.25s ease-out;
+            /* Own compositor layer: the open/close scale animates without
+               repainting the list behind it. */
+            will-change: transform;
+        }
+        .history-panel-overlay.active .history-panel-content {
+            transform: scale(1);
+        }
+        .close-btn {
+            position: absolute;
+            top: 8px;
+            right: 12px;
+            background: none;
+            border: none;
+            font-size: 22px;
+            color: var(--color-muted);
+            cursor: pointer;
+            line-height: 1;
+            transition: color 0.2s;
+        }
+        .close-btn:hover {
+            color: var(--color-warn);
+        }
+        .history-title {
+            font-size: 18px;
+            margin-top: 0;
+            margin-bottom: 10px;
+            font-weight: 700;
+        }
+        .history-status {
+            font-size: 13px;
+            color: var(--color-muted);
+            text-align: center;
+            padding: 10px 0;
+        }
+        .history-status.error {
+            color: var(--color-warn);
+        }
+        /* Windowed list: the scroller is a viewport onto a spacer sized
+           for every row, but only rows near the viewport are in the DOM. */
+        .history-scroll {
+            max-height: 55vh;
+            overflow-y: auto;
+            position: relative;
+        }
+        .history-spacer {
+            position: relative;
+        }
+        .history-list {
+            list-style: none;
+            padding: 0;
+            margin: 0;
+        }
+        .history-item {
+            background-color: #F9FAFB;
+            border: 1px solid #E5E7EB;
+            border-left: 4px solid var(--color-accent);
+            border-radius: 8px;
+            padding: 10px 12px;
+            position: absolute;
+            top: 0;
+            left: 0;
+            right: 0;
+            height: 64px;
+            overflow: hidden;
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+            transition: box-shadow 0.15s;
+            /* Rows move via translateY during scroll; promoting them keeps
+               that on the compositor. */
+            will-change: transform, box-shadow;
+        }
+        .history-item:hover {
+            box-shadow: 0 4px 10px rgba(15, 23, 42, 0.08);
+        }
+        .history-details strong {
+            color: var(--color-text);
+            font-weight: 700;
+            font-size: 14px;
+        }
+        .history-time {
+            font-size: 11px;
+            color: var(--color-muted);
+            text-align: right;
+        }
+
+        footer.site {
+            margin-top: auto; padding: 10px 20px; text-align: center; color: var(--color-muted);
+            background-color: rgba(255, 255, 255, 0.9); border-top: 1px solid #E5E7EB;
+            font-size: 11px;
+        }
+    </style>
+</head>
+<body>
+    <div class="page">
+        <header class="topbar">
+            <div class="brand">
+              Application for Assessment of Quality of Textbook / Reference Books / E-Books
+              <span>Upload academic materials and obtain AI-assisted quality insights.</span>
+            </div>
+            <div class="header-actions">
+                <button id="history-toggle-btn" class="action-btn" title="View Previous Evaluations">History</button>
+                <a class="logout-btn" href="{{ url_for('logout') }}">Logout</a>
+            </div>
+        </header>
+        <section class="hero" role="banner" aria-label="Textbook quality assessment intro">
+            <h1>Evaluate Textbook & E-Book Quality in Minutes</h1>
+            <p>
+              Upload a PDF, Word document, text file, or a photo of a textbook page — either from your files
+              or directly using your device camera — to receive an AI-assisted review.
+            </p>
+        </section>
+        <main>
+            <div class="content">
+                <h1 class="title"><b>Textbook / Reference / E-Book Analyzer</b></h1>
+                <p class="subtitle-main">
+                    This tool provides a preliminary, automated assessment of educational material quality.
+                    Use the output as a supporting opinion, not as a replacement for expert academic review.
+                </p>
+
+                <!-- FILE UPLOAD SECTION -->
+                <div class="file-wrap">
+                  <form id="uploadForm" action="/analyze" method="post" enctype="multipart/form-data">
+                    <p class="hint">
+                        Supported formats: <b>PDF (.pdf)</b>, <b>Word (.docx)</b>, <b>Text (.txt)</b>,
+                        or <b>image files</b> of textbook pages.
+                    </p>
+                    <input type="file" id="fileInput" name="file"
+                           accept=".pdf,.docx,.txt,image/*"
+                           required><br>
+                    <div class="actions">
+                      <button class="btn" type="submit"><b>Analyze Uploaded File</b></button>
+                    </div>
+                  </form>
+                </div>
+
+                <div class="divider-or">or use integrated camera</div>
+
+                <!-- CAMERA CAPTURE SECTION -->
+                <div class="camera-wrap">
+                    <div class="camera-title">Capture a Textbook Page with Camera</div>
+                    <div class="camera-grid">
+                        <div class="camera-preview-box">
+                            <video id="cameraVideo" autoplay playsinline></video>
+                            <canvas id="cameraCanvas" style="display:none;"></canvas>
+                        </div>
+                        <div class="camera-side">
+                            <div class="hint">
+                                1. Click <b>Start Camera</b> and allow browser permission.<br>
+                                2. Hold the textbook page clearly in front of the camera.<br>
+                                3. Click <b>Capture Photo</b> and then <b>Analyze Photo</b>.
+                            </div>
+                            <div class="actions">
+                                <button id="cameraStartBtn" class="btn outline" type="button">Start Camera</button>
+                                <button id="cameraCaptureBtn" class="btn secondary" type="button">Capture Photo</button>
+                            </div>
+                            <div class="actions">
+                                <button id="cameraAnalyzeBtn" class="btn" type="button">Analyze Photo</button>
+                            </div>
+                            <div id="cameraStatus" class="camera-status">
+                                Camera not started. Click "Start Camera" to begin.
+                            </div>
+                        </div>
+                    </div>
+                </div>
+
+                <div id="result"></div>
+            </div>
+        </main>
+        <footer class="site">
+            <small>
+                This is a <b>supporting tool</b> for educational quality review. Always combine AI feedback
+                with judgment from qualified subject experts.
+            </small>
+        </footer>
+    </div>
+
+    <div id="history-panel" class="history-panel-overlay">
+        <div class="history-panel-content">
+            <button class="close-btn" onclick="toggleHistory(false)">×</button>
+            <div class="history-section">
+                <div class="history-title">Recent Evaluation History</div>
+                <div id="history-status" class="history-status">
+                    Click "History" to load your full evaluation history.
+                </div>
+                <div id="history-scroll" class="history-scroll">
+                    <div id="history-spacer" class="history-spacer">
+                        <ul id="history-window" class="history-list"></ul>
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+
+    <script>
+    function toggleHistory(show) {
+        if (show === undefined) {
+            historyPanelEl.classList.toggle('active');
+        } else if (show) {
+            historyPanelEl.classList.add('active');
+        } else {
+            historyPanelEl.classList.remove('active');
+        }
+    }
+
+    // Windowed history list: only rows near the viewport exist in the
+    // DOM, so opening the panel costs the same for 10 or 10,000 records.
+    const HISTORY_ROW_HEIGHT = 72;   // row pitch in px (64px card + 8px gap)
+    const HISTORY_WINDOW_BUFFER = 4; // extra rows rendered above/below view
+
+    let historyItems = [];
+    const historyRowPool = [];
+
+    // Panel elements are cached once at startup; repeated lookups per
+    // render/scroll tick are wasted work.
+    let historyPanelEl = null;
+    let historyScrollEl = null;
+    let historyWindowEl = null;
+    let historySpacerEl = null;
+    let historyStatusEl = null;
+
+    function makeHistoryRow() {
+        const li = document.createElement('li');
+        li.className = 'history-item';
+        const details = document.createElement('div');
+        details.className = 'history-details';
+        details.appendChild(document.createElement('strong'));
+        details.appendChild(document.createElement('br'));
+        details.appendChild(document.createElement('small'));
+        const time = document.createElement('div');
+        time.className = 'history-time';
+        li.appendChild(details);
+        li.appendChild(time);
+        return li;
+    }
+
+    function renderHistoryWindow() {
+        const start = Math.max(0,
+            Math.floor(historyScrollEl.scrollTop / HISTORY_ROW_HEIGHT) - HISTORY_WINDOW_BUFFER);
+        const count = Math.ceil(historyScrollEl.clientHeight / HISTORY_ROW_HEIGHT)
+            + HISTORY_WINDOW_BUFFER * 2;
+        const end = Math.min(historyItems.length, start + count);
+
+        if (historyRowPool.length < end - start) {
+            // Grow the row pool in one append so layout runs once
+            const frag = document.createDocumentFragment();
+            while (historyRowPool.length < end - start) {
+                const row = makeHistoryRow();
+                historyRowPool.push(row);
+                frag.appendChild(row);
+            }
+            historyWindowEl.appendChild(frag);
+        }
+
+        for (let slot = 0; slot < historyRowPool.length; slot++) {
+            const row = historyRowPool[slot];
+            const index = start + slot;
+            if (index >= end) {
+                row.style.display = 'none';
+                continue;
+            }
+            const item = historyItems[index];
+            const summary = item.summary || '';
+            const shortSummary = summary.slice(0, 80);
+            // Rows are repositioned and updated in place; no HTML reparse.
+            row.style.display = '';
+            row.style.transform = `translateY(${index * HISTORY_ROW_HEIGHT}px)`;
+            row.querySelector('strong').textContent = item.overall_rating || 'No rating';
+            row.querySelector('small').textContent = shortSummary
+                ? shortSummary + (summary.length > 80 ? '…' : '')
+                : 'No summary stored.';
+            row.querySelector('.history-time').textContent =
+                (item.timestamp || '').split(' ')[0] || '';
+        }
+    }
+
+    function setHistoryStatus(message, isError) {
+        historyStatusEl.textContent = message || '';
+        historyStatusEl.style.display = message ? '' : 'none';
+        historyStatusEl.classList.toggle('error', !!isError);
+    }
+
+    async function loadHistory() {
+        toggleHistory(true);
+        setHistoryStatus('Loading history...');
+        historyItems = [];
+        historySpacerEl.style.height = '0px';
+        renderHistoryWindow();
+
+        try {
+            const res = await fetch('/user_history', {
+                method: 'GET',
+                credentials: 'same-origin'
+            });
+
+            if (!res.ok) {
+                throw new Error('Server error: ' + res.status);
+            }
+
+            const data = await res.json();
+            historyItems = data.history || [];
+
+            if (!historyItems.length) {
+                setHistoryStatus('No previous evaluation history found.');
+                return;
+            }
+
+            setHistoryStatus('');
+            historySpacerEl.style.height =
+                (historyItems.length * HISTORY_ROW_HEIGHT) + 'px';
+            renderHistoryWindow();
+        } catch (err) {
+            console.error(err);
+            setHistoryStatus('Error loading history: ' + err.message, true);
+        }
+    }
+
+    const uploadForm = document.getElementById('uploadForm');
+    const resultBox = document.getElementById('result');
+
+    // Files at or above this size are uploaded as parallel chunks; below
+    // it, a single POST is cheaper than the chunking overhead.
+    const CHUNKED_UPLOAD_MIN_BYTES = 5 * 1024 * 1024;
+    const UPLOAD_CHUNK_BYTES = 8 * 1024 * 1024;
+    const UPLOAD_PARALLELISM = 4;
+
+    // Phone photos of textbook pages are often 5-8 MB at 4000px; text
+    // analysis doesn't improve past ~1600px on the long side, so shrink
+    // and re-encode in the browser before uploading. Mirrors the server's
+    // downscale thresholds.
+    // Server rejects oversized bodies too; checking here saves uploading
+    // the bytes only to get a 413 back.
+    const MAX_UPLOAD_BYTES = 100 * 1024 * 1024;
+
+    const IMAGE_UPLOAD_DOWNSCALE_BYTES = 400 * 1024;
+    const IMAGE_UPLOAD_MAX_DIMENSION = 1600;
+    const IMAGE_UPLOAD_JPEG_QUALITY = 0.8;
+
+    async function downscaleImageForUpload(file) {
+      if (!file.type.startsWith('image/') || file.size < IMAGE_UPLOAD_DOWNSCALE_BYTES) {
+        return file;
+      }
+      if (typeof createImageBitmap !== 'function' || typeof OffscreenCanvas !== 'function') {
+        return file;
+      }
+      try {
+        const bitmap = await createImageBitmap(file);
+        const scale = IMAGE_UPLOAD_MAX_DIMENSION / Math.max(bitmap.width, bitmap.height);
+        if (scale >= 1) {
+          bitmap.close();
+          return file;
+        }
+        const canvas = new OffscreenCanvas(
+          Math.round(bitmap.width * scale), Math.round(bitmap.height * scale));
+        canvas.getContext('2d').drawImage(bitmap, 0, 0, canvas.width, canvas.height);
+        bitmap.close();
+        const blob = await canvas.convertToBlob(
+          {type: 'image/jpeg', quality: IMAGE_UPLOAD_JPEG_QUALITY});
+        // A pathological image can re-encode larger; keep the original then.
+        return blob.size < file.size ? blob : file;
+      } catch (err) {
+        return file;
+      }
+    }
+
+    // Uploads file chunks with a small pool of concurrent workers and
+    // returns the upload id once every chunk has been accepted.
+    async function uploadFileInChunks(file, signal) {
+      const uploadId = (crypto.randomUUID)
+        ? crypto.randomUUID()
+        : String(Date.now()) + '-' + Math.random().toString(16).slice(2);
+      const offsets = [];
+      for (let off = 0; off < file.size; off += UPLOAD_CHUNK_BYTES) {
+        offsets.push(off);
+      }
+      let next = 0;
+      async function worker() {
+        while (next < offsets.length) {
+          const off = offsets[next++];
+          const res = await fetch('/analyze/chunk', {
+            method: 'PUT',
+            credentials: 'same-origin',
+            headers: {
+              'Upload-Id': uploadId,
+              'Upload-Offset': String(off),
+              'Upload-Length': String(file.size)
+            },
+            body: file.slice(off, off + UPLOAD_CHUNK_BYTES),
+            signal
+          });
+          if (!res.ok) {
+            throw new Error('Chunk upload failed: ' + res.status);
+          }
+        }
+      }
+      const workers = Math.min(UPLOAD_PARALLELISM, offsets.length);
+      await Promise.all(Array.from({ length: workers }, worker));
+      return uploadId;
+    }
+
+    // At most one analysis request is in flight; starting a new one
+    // aborts the old so its upload stops costing bandwidth immediately.
+    let inflightCtl = null;
+
+    // Shared analysis runner: handles button state and result rendering
+    // around whatever request strategy performRequest implements.
+    async function runAnalysis(submitBtn, performRequest) {
+      if (inflightCtl) inflightCtl.abort();
+      const ctl = new AbortController();
+      inflightCtl = ctl;
+      submitBtn.disabled = true;
+      const oldLabel = submitBtn.textContent;
+      submitBtn.textContent = 'Analyzing...';
+      resultBox.classList.remove('show');
+      resultBox.innerHTML = '';
+
+      try {
+        const res = await performRequest(ctl.signal);
+
+        let data = null;
+        try {
+          data = await res.json();
+        } catch (_) {
+          data = null;
+        }
+
+        if (!res.ok) {
+          const msg = (data && data.error) ? data.error : `Unexpected server error (${res.status})`;
+          throw new Error(msg);
+        }
+
+        const now = new Date().toLocaleString();
+
+        const accuracyScore = data.accuracy_score;
+        const readabilityScore = data.readability_score;
+        const consistencyScore = data.consistency_score;
+        const overallScore = data.overall_rating;
+
+        const accuracy = data.accuracy ?? 'Not available';
+        const readability = data.readability ?? 'Not available';
+        const consistency = data.consistency ?? 'Not available';
+        const summary = data.summary ?? 'Not available';
+
+        const overallDisplay = (overallScore !== undefined && overallScore !== null)
+          ? `${overallScore}/5`
+          : 'Not available';
+
+        const formatPercent = (val) => {
+          if (val === undefined || val === null || isNaN(val)) return 'N/A';
+          return `${val}%`;
+        };
+
+        resultBox.innerHTML = `
+          <div class="result-card">
+            <div class="result-header">
+              <div class="result-pill">
+                <span class="result-pill-dot"></span>
+                <span>AI Quality Evaluation</span>
+              </div>
+              <div class="result-time">${now}</div>
+            </div>
+
+            <h2 class="result-title">${overallDisplay}</h2>
+            <p class="result-subtitle">
+              This card summarizes the AI-assisted evaluation of the uploaded or captured textbook / reference / e-book content.
+            </p>
+
+            <div class="result-grid">
+              <div class="result-section">
+                <h3>Accuracy (${formatPercent(accuracyScore)})</h3>
+                <p>${accuracy}</p>
+              </div>
+              <div class="result-section">
+                <h3>Readability (${formatPercent(readabilityScore)})</h3>
+                <p>${readability}</p>
+              </div>
+              <div class="result-section">
+                <h3>Consistency (${formatPercent(consistencyScore)})</h3>
+                <p>${consistency}</p>
+              </div>
+              <div class="result-section">
+                <h3>Summary</h3>
+                <p>${summary}</p>
+              </div>
+            </div>
+
+            <p class="result-note">
+              This is a <strong>preliminary AI-based assessment</strong>, not a formal academic review.
+              Please combine these insights with evaluations by qualified subject-matter experts before making
+              publishing or curriculum decisions.
+            </p>
+          </div>
+        `;
+        resultBox.classList.add('show');
+        resultBox.scrollIntoView({ behavior: 'smooth', block: 'nearest' });
+
+      } catch (err) {
+        // A superseded request's rejection is expected; the new run owns the UI.
+        if (err.name !== 'AbortError') {
+          resultBox.innerHTML = `<p style="color:#EF4444; font-size:13px;"><strong>Error:</strong> ${err.message}</p>`;
+          resultBox.classList.add('show');
+        }
+      } finally {
+        if (inflightCtl === ctl) inflightCtl = null;
+        submitBtn.disabled = false;
+        submitBtn.textContent = oldLabel;
+      }
+    }
+
+    // Single-POST path (small files and camera captures)
+    async function analyzeFormData(fd, submitBtn) {
+      await runAnalysis(submitBtn, (signal) => fetch('/analyze', {
+        method: 'POST',
+        body: fd,
+        credentials: 'same-origin',
+        signal
+      }));
+    }
+
+    // Chunked path for large files: parallel chunk PUTs, then complete
+    async function analyzeLargeFile(file, submitBtn) {
+      await runAnalysis(submitBtn, async (signal) => {
+        const uploadId = await uploadFileInChunks(file, signal);
+        return fetch('/analyze/complete', {
+          method: 'POST',
+          credentials: 'same-origin',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({
+            upload_id: uploadId,
+            filename: file.name,
+            content_type: file.type
+          }),
+          signal
+        });
+      });
+    }
+
+    // Handle normal file upload form
+    uploadForm.addEventListener('submit', async (e) => {
+      e.preventDefault();
+      const form = e.currentTarget;
+      const submitBtn = form.querySelector('button[type="submit"]');
+      const file = document.getElementById('fileInput').files[0];
+      if (file && file.size > MAX_UPLOAD_BYTES) {
+        resultBox.innerHTML = `<p style="color:#EF4444; font-size:13px;"><strong>Error:</strong> File is too large (${Math.round(file.size / (1024 * 1024))} MB). Maximum size is ${MAX_UPLOAD_BYTES / (1024 * 1024)} MB.</p>`;
+        resultBox.classList.add('show');
+        return;
+      }
+      if (file && file.type.startsWith('image/')) {
+        const shrunk = await downscaleImageForUpload(file);
+        // Downscaling normally lands far below the chunk threshold, but
+        // the fallbacks (no OffscreenCanvas, decode failure) return the
+        // original file; anything still large goes through the chunked
+        // path so it never exceeds the server's single-POST body limit.
+        if (shrunk.size >= CHUNKED_UPLOAD_MIN_BYTES) {
+          const asFile = (shrunk instanceof File)
+            ? shrunk
+            : new File([shrunk], file.name, { type: shrunk.type || file.type });
+          await analyzeLargeFile(asFile, submitBtn);
+          return;
+        }
+        const fd = new FormData(form);
+        fd.set('file', shrunk, file.name);
+        await analyzeFormData(fd, submitBtn);
+        return;
+      }
+      if (file && file.size >= CHUNKED_UPLOAD_MIN_BYTES) {
+        await analyzeLargeFile(file, submitBtn);
+        return;
+      }
+      const fd = new FormData(form);
+      await analyzeFormData(fd, submitBtn);
+    });
+
+    // CAMERA LOGIC
+    // Reading a printed page doesn't benefit beyond ~1280px; capping the
+    // stream and capture shrinks every downstream stage (draw, encode,
+    // upload, model ingestion), and 0.75 JPEG quality is fine for text.
+    const CAMERA_CONSTRAINTS = {
+      video: {
+        width: { ideal: 1280 },
+        height: { ideal: 960 },
+        facingMode: { ideal: 'environment' }
+      }
+    };
+    const CAPTURE_MAX_WIDTH = 1280;
+    const CAPTURE_JPEG_QUALITY = 0.75;
+
+    let cameraStream = null;
+    let capturedImageBlob = null;
+
+    const cameraVideo = document.getElementById('cameraVideo');
+    const cameraCanvas = document.getElementById('cameraCanvas');
+    const cameraStatus = document.getElementById('cameraStatus');
+    const cameraStartBtn = document.getElementById('cameraStartBtn');
+    const cameraCaptureBtn = document.getElementById('cameraCaptureBtn');
+    const cameraAnalyzeBtn = document.getElementById('cameraAnalyzeBtn');
+
+    function stopCamera() {
+      if (cameraStream) {
+        cameraStream.getTracks().forEach(t => t.stop());
+        cameraStream = null;
+        cameraVideo.srcObject = null;
+      }
+    }
+
+    cameraStartBtn.addEventListener('click', async () => {
+      try {
+        if (!navigator.mediaDevices || !navigator.mediaDevices.getUserMedia) {
+          cameraStatus.textContent = 'Camera not supported in this browser/device.';
+          return;
+        }
+        stopCamera(); // idempotent: restarting replaces any live stream
+        cameraStream = await navigator.mediaDevices.getUserMedia(CAMERA_CONSTRAINTS);
+        cameraVideo.srcObject = cameraStream;
+        cameraVideo.style.display = 'block';
+        cameraCanvas.style.display = 'none';
+        cameraStatus.textContent = 'Camera is on. Position the page and click "Capture Photo".';
+      } catch (err) {
+        console.error(err);
+        cameraStatus.textContent = 'Unable to access camera: ' + err.message;
+      }
+    });
+
+    // JPEG encoding runs in a worker on an OffscreenCanvas, so grabbing
+    // a 1080p frame never stalls the main thread's layout/paint. The
+    // worker is built from an inline blob since the app has no static
+    // script files.
+    const cameraWorkerSource = `
+      self.onmessage = async (e) => {
+        const { bitmap, quality } = e.data;
+        try {
+          const canvas = new OffscreenCanvas(bitmap.width, bitmap.height);
+          canvas.getContext('2d').drawImage(bitmap, 0, 0);
+          bitmap.close();
+          const blob = await canvas.convertToBlob({ type: 'image/jpeg', quality });
+          self.postMessage({ blob });
+        } catch (err) {
+          self.postMessage({ error: err.message });
+        }
+      };
+    `;
+    let cameraWorker = null;
+
+    function getCameraWorker() {
+      if (!cameraWorker && window.Worker && window.OffscreenCanvas) {
+        cameraWorker = new Worker(URL.createObjectURL(
+          new Blob([cameraWorkerSource], { type: 'text/javascript' })));
+      }
+      return cameraWorker;
+    }
+
+    function encodeFrameInWorker(bitmap, quality) {
+      const worker = getCameraWorker();
+      return new Promise((resolve, reject) => {
+        worker.onmessage = (e) => e.data.error
+          ? reject(new Error(e.data.error))
+          : resolve(e.data.blob);
+        worker.onerror = (e) => reject(new Error(e.message || 'Worker error'));
+        // Transfer the bitmap instead of copying the pixel data
+        worker.postMessage({ bitmap, quality }, [bitmap]);
+      });
+    }
+
+    cameraCaptureBtn.addEventListener('click', async () => {
+      if (!cameraStream) {
+        cameraStatus.textContent = 'Start camera first.';
+        return;
+      }
+      try {
+        const trackSettings = cameraStream.getVideoTracks()[0].getSettings();
+        const rawWidth = trackSettings.width || 640;
+        const rawHeight = trackSettings.height || 480;
+        // Cap the capture even if the camera ignored the constraints
+        const scale = Math.min(1, CAPTURE_MAX_WIDTH / rawWidth);
+        const width = Math.round(rawWidth * scale);
+        const height = Math.round(rawHeight * scale);
+
+        // Cheap preview draw on the main thread; the expensive JPEG
+        // encode happens off-thread when a worker is available.
+        cameraCanvas.width = width;
+        cameraCanvas.height = height;
+        cameraCanvas.getContext('2d').drawImage(cameraVideo, 0, 0, width, height);
+        cameraVideo.style.display = 'none';
+        cameraCanvas.style.display = 'block';
+
+        let blob;
+        if (getCameraWorker() && window.createImageBitmap) {
+          const bitmap = await createImageBitmap(cameraVideo, {
+            resizeWidth: width,
+            resizeHeight: height,
+            resizeQuality: 'high'
+          });
+          blob = await encodeFrameInWorker(bitmap, CAPTURE_JPEG_QUALITY);
+        } else {
+          blob = await new Promise((resolve) =>
+            cameraCanvas.toBlob(resolve, 'image/jpeg', CAPTURE_JPEG_QUALITY));
+        }
+        if (!blob) {
+          cameraStatus.textContent = 'Failed to capture image from camera.';
+          return;
+        }
+        capturedImageBlob = blob;
+        // Power the sensor down between captures; Start Camera re-arms it.
+        stopCamera();
+        cameraStatus.textContent =
+          'Photo captured. Click "Analyze Photo" to evaluate, or "Start Camera" to retake.';
+      } catch (err) {
+        console.error(err);
+        cameraStatus.textContent = 'Failed to capture image: ' + err.message;
+      }
+    });
+
+    cameraAnalyzeBtn.addEventListener('click', async () => {
+      if (!capturedImageBlob) {
+        cameraStatus.textContent = 'No captured photo found. Capture a photo first.';
+        return;
+      }
+      const fd = new FormData();
+      fd.append('file', capturedImageBlob, 'camera_capture.jpg');
+      await analyzeFormData(fd, cameraAnalyzeBtn);
+    });
+
+    // Stop camera when leaving page (optional)
+    window.addEventListener('beforeunload', stopCamera);
+
+    document.addEventListener('DOMContentLoaded', () => {
+      historyPanelEl = document.getElementById('history-panel');
+      historyScrollEl = document.getElementById('history-scroll');
+      historyWindowEl = document.getElementById('history-window');
+      historySpacerEl = document.getElementById('history-spacer');
+      historyStatusEl = document.getElementById('history-status');
+
+      document.getElementById('history-toggle-btn').addEventListener('click', () => {
+        loadHistory();
+      });
+      // Coalesce scroll events to one window update per frame.
+      let historyScrollTicking = false;
+      historyScrollEl.addEventListener('scroll', () => {
+        if (historyScrollTicking) return;
+        historyScrollTicking = true;
+        requestAnimationFrame(() => {
+          renderHistoryWindow();
+          historyScrollTicking = false;
+        });
+      });
+    });
+    </script>
+</body>
+</html>
+"""
+
+# Pre-compile the main app template once, like the auth templates above.
+MAIN_APP_TMPL = app.jinja_env.from_string(main_app_html)
+
+# Rendered main-page bytes (plain + gzip) built on first request; the
+# template has no per-user state, so the output is identical for every
+# authenticated visitor.
+_main_app_page_cache: dict = {}
+
+
+def _get_main_app_page() -> dict:
+    if not _main_app_page_cache:
+        raw = MAIN_APP_TMPL.render().encode("utf-8")
+        _main_app_page_cache["plain"] = raw
+        _main_app_page_cache["gzip"] = gzip.compress(raw, compresslevel=9)
+        _main_app_page_cache["etag"] = hashlib.blake2b(raw, digest_size=8).hexdigest()
+    return _main_app_page_cache
+
+# ========================= Flask Routes ==========================
+
+# scrypt tuned to ~50ms per hash; the Werkzeug pbkdf2 default costs
+# ~100ms of pure CPU and holds a worker for the whole of it.
+PASSWORD_HASH_METHOD = "scrypt:32768:8:1"
+
+
+@app.route("/login", methods=["GET", "POST"])
+async def login():
+    if request.method == "POST":
+        username = request.form["username"]
+        password = request.form["password"]
+
+        user = users_collection.find_one({"username": username})
+        # Hash verification is deliberately slow; keep it off the event loop.
+        if user and await asyncio.to_thread(
+            check_password_hash, user.get("password_hash", ""), password
+        ):
+            # Accounts created before the scrypt switch still carry pbkdf2
+            # hashes; upgrade them now while the plaintext is in hand.
+            if user["password_hash"].startswith("pbkdf2"):
+                new_hash = await asyncio.to_thread(
+                    generate_password_hash, password, method=PASSWORD_HASH_METHOD
+                )
+                users_collection.update_one(
+                    {"_id": user["_id"]},
+                    {"$set": {"password_hash": new_hash}},
+                )
+            session["logged_in"] = True
+            session["username"] = username
+            session["user_id"] = str(user["_id"])
+            return redirect(url_for("home"))
+
+        return LOGIN_TMPL.render(error="Invalid credentials")
+
+    return LOGIN_TMPL.render(message=request.args.get("message"))
+
+
+@app.route("/register", methods=["GET", "POST"])
+async def register():
+    if request.method == "POST":
+        username = request.form["username"]
+        password = request.form["password"]
+
+        existing = users_collection.find_one({"username": username})
+        if existing:
+            return REGISTER_TMPL.render(
+                error="Username already exists. Please choose a different one.",
+            )
+
+        password_hash = await asyncio.to_thread(
+            generate_password_hash, password, method=PASSWORD_HASH_METHOD
+        )
+
+        users_collection.insert_one({
+            "username": username,
+            "password_hash": password_hash,
+            "created_at": datetime.utcnow(),
+        })
+
+        return redirect(
+            url_for("login", message="Account created successfully! Please log in.")
+        )
+
+    return REGISTER_TMPL.render()
+
+
+@app.route("/logout")
+def logout():
+    session.pop("logged_in", None)
+    session.pop("username", None)
+    session.pop("user_id", None)
+    return redirect(url_for("login"))
+
+
+@app.route("/")
+def home():
+    if "logged_in" not in session:
+        return redirect(url_for("login"))
+
+    page = _get_main_app_page()
+    if page["etag"] in request.if_none_match:
+        return "", 304
+
+    accepts_gzip = "gzip" in (request.headers.get("Accept-Encoding") or "")
+    resp = Response(page["gzip"] if accepts_gzip else page["plain"], mimetype="text/html")
+    if accepts_gzip:
+        resp.headers["Content-Encoding"] = "gzip"
+    resp.headers["Vary"] = "Accept-Encoding"
+    # no-cache: every visit revalidates, so the session check always runs
+    # (no cached app shell after logout) and a redeploy shows up at once;
+    # an unchanged page is still just the ETag 304 above.
+    resp.headers["Cache-Control"] = "private, no-cache"
+    resp.set_etag(page["etag"])
+    return resp
+
+
+# Evaluation documents are written off the request path: the user has
+# already received the analysis, so there is no reason to make the HTTP
+# response wait on a Mongo round-trip.
+_persist_executor = ThreadPoolExecutor(max_workers=4)
+
+# The eval insert is best-effort logging (failures were only ever
+# printed), so w=0 skips even the primary's acknowledgement.
+_evaluations_unacked = evaluations_collection.with_options(
+    write_concern=WriteConcern(w=0)
+)
+
+
+def _persist_eval(eval_doc, full_extracted_text, raw_evaluation):
+    try:
+        result = _evaluations_unacked.insert_one(eval_doc)
+        # The driver assigns _id client-side, so it is usable even with
+        # the unacknowledged write above.
+        evaluation_blobs_collection.insert_one({
+            "_id": result.inserted_id,
+            "full_extracted_text": full_extracted_text,
+            "raw_evaluation": raw_evaluation,
+        })
+    except Exception as e:
+        print(f"Error saving evaluation to MongoDB: {e}")
+
+
+@app.route("/analyze", methods=["POST"])
+async def analyze():
+    if "logged_in" not in session or "user_id" not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    if "file" not in request.files:
+        return jsonify({"error": "No file found in request"}), 400
+
+    file = request.files["file"]
+
+    if not file.filename:
+        # if file comes from camera blob, filename might be present but safe-guard:
+        filename = getattr(file, "filename", "") or "camera_capture.jpg"
+    else:
+        filename = file.filename
+
+    content_type = file.content_type or ""
+
+    return await _analyze_payload(filename, content_type, file.stream)
+
+
+async def _analyze_payload(filename: str, content_type: str, stream):
+    """
+    Shared pipeline behind /analyze and /analyze/complete: spool the
+    payload, store it in GridFS, evaluate it (or reuse a cached
+    evaluation), persist the evaluation document, and build the JSON
+    response. Must run inside a request context with a logged-in user.
+    """
+    spooled = None
+    try:
+        # Spool the upload once, computing its hash and size in the same
+        # streaming pass instead of materializing the payload up front.
+        content_hash, spooled, file_size = _spool_upload(stream)
+
+        # Store file in GridFS (deduplicated by content hash, chunked
+        # straight from the spool)
+        file_id = store_upload_in_gridfs(
+            spooled,
+            filename,
+            content_type,
+            session["user_id"],
+            content_hash,
+            file_size,
+        )
+
+        # Decide if it's an image or document
+        lower_name = filename.lower()
+        is_image = (
+            content_type.startswith("image/")
+            or lower_name.endswith((".png", ".jpg", ".jpeg", ".webp", ".bmp", ".gif"))
+        )
+
+        text_content = None
+        image_bytes = None
+        image_mime = None
+
+        # Identical content (same hash, model, prompt) reuses the stored
+        # evaluation; in that case the payload never needs to be read
+        # back out of the spool at all.
+        evaluation_data = lookup_cached_evaluation(content_hash)
+        cache_hit = evaluation_data is not None
+        if evaluation_data is None:
+            if is_image:
+                spooled.seek(0)
+                image_bytes = spooled.read()
+                image_mime = content_type if content_type.startswith("image/") else "image/jpeg"
+            elif (
+                lower_name.endswith(".pdf")
+                and file_size >= LARGE_PDF_SPOOL_BYTES
+            ):
+                # Big PDFs go disk-to-disk from the spool and are parsed
+                # from the temp file path, never read into memory whole.
+                text_content = await asyncio.to_thread(
+                    extract_text_from_pdf_spool, spooled
+                )
+            else:
+                spooled.seek(0)
+                file_bytes = spooled.read()
+                # Extract text from pdf/docx/txt off the event loop
+                text_content = await asyncio.to_thread(
+                    extract_text_from_file_bytes, filename, file_bytes
+                )
+
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to process file: {e}"}), 400
+    finally:
+        if spooled is not None:
+            spooled.close()
+
+    if evaluation_data is None:
+        evaluation_data = await evaluate_textbook_gemini(
+            text_content=text_content or "",
+            image_bytes=image_bytes,
+            image_mime=image_mime,
+        )
+        if "error" in evaluation_data:
+            return jsonify(evaluation_data), 500
+        store_cached_evaluation(content_hash, evaluation_data)
+
+    # Overall rating (string form for display)
+    overall_num = evaluation_data.get("overall_rating", None)
+    if isinstance(overall_num, (int, float)):
+        overall_str = f"{overall_num}/5"
+    else:
+        overall_str = str(overall_num) if overall_num is not None else "No rating"
+
+    # --- Save FULL evaluation document in MongoDB ---
+    input_type = "image" if is_image else "document"
+    try:
+        eval_doc = {
+            "user_id": ObjectId(session["user_id"]),
+            "username": session.get("username"),
+            "timestamp": datetime.utcnow(),
+
+            "input_type": input_type,
+
+            # File info
+            "file_id": file_id,
+            "original_filename": filename,
+            "content_type": content_type,
+            "content_hash": content_hash,
+
+            # Scores
+            "accuracy_score": evaluation_data.get("accuracy_score"),
+            "readability_score": evaluation_data.get("readability_score"),
+            "consistency_score": evaluation_data.get("consistency_score"),
+
+            # Full explanation texts from analyzer
+            "accuracy_text": evaluation_data.get("accuracy", ""),
+            "readability_text": evaluation_data.get("readability", ""),
+            "consistency_text": evaluation_data.get("consistency", ""),
+
+            # Overall rating (numeric + string)
+            "overall_rating_value": evaluation_data.get("overall_rating"),
+            "overall_rating": overall_str,
+
+            # Summary text (full)
+            "summary": evaluation_data.get("summary", ""),
+        }
+        # The doc is fully built from plain values (nothing request-scoped),
+        # so the insert can run in the background while the response goes
+        # out. The bulky fields — full extracted text and raw model JSON —
+        # go to the cold blobs collection instead of the hot doc.
+        _persist_executor.submit(
+            _persist_eval,
+            eval_doc,
+            text_content if text_content else None,
+            evaluation_data,
+        )
+    except Exception as e:
+        print(f"Error saving evaluation to MongoDB: {e}")
+
+    # --- Response to frontend ---
+    return jsonify(
+        {
+            "accuracy_score": evaluation_data.get("accuracy_score"),
+            "accuracy": evaluation_data.get("accuracy", "AI analysis unavailable."),
+            "readability_score": evaluation_data.get("readability_score"),
+            "readability": evaluation_data.get(
+                "readability", "AI analysis unavailable."
+            ),
+            "consistency_score": evaluation_data.get("consistency_score"),
+            "consistency": evaluation_data.get(
+                "consistency", "AI analysis unavailable."
+            ),
+            "overall_rating": evaluation_data.get(
+                "overall_rating", "AI analysis unavailable."
+            ),
+            "summary": evaluation_data.get("summary", "AI analysis unavailable."),
+            "cached": cache_hit,
+        }
+    )
+
+
+# --- Chunked uploads (large files) ---
+#
+# Big PDFs are uploaded by the browser as parallel PUTs of fixed-size
+# chunks written into a per-upload temp file, so a dropped connection
+# only costs one chunk instead of the whole transfer. /analyze/complete
+# then runs the assembled file through the normal analysis pipeline.
+#
+# NOTE: upload state is per-process. With more than one gunicorn worker
+# the browser's parallel PUTs land on different processes and no upload
+# can ever assemble — the Procfile pins --workers 1 --threads 8 for this
+# reason (gunicorn otherwise takes worker count from $WEB_CONCURRENCY,
+# which PaaS platforms set above 1). Move this state into Mongo/Redis
+# before scaling out to multiple workers.
+
+_chunked_uploads: dict = {}
+_chunked_uploads_lock = threading.Lock()
+
+# Upload-Length is client-supplied and preallocates disk, so cap it at
+# the same 100 MB the client's own preflight advertises.
+CHUNKED_UPLOAD_MAX_BYTES = 100 * 1024 * 1024
+
+# Uploads with no chunk activity for this long are reclaimed. Abandonment
+# is a normal flow, not an edge case: superseding an analysis aborts its
+# transfer mid-flight and the remaining chunks never arrive.
+CHUNKED_UPLOAD_TTL_SECONDS = 15 * 60
+
+
+def _sweep_stale_uploads() -> None:
+    """
+    Drops uploads idle past the TTL and unlinks their part files.
+    Caller must hold _chunked_uploads_lock.
+    """
+    now = time.monotonic()
+    for upload_id in list(_chunked_uploads):
+        upload = _chunked_uploads[upload_id]
+        if now - upload["touched"] > CHUNKED_UPLOAD_TTL_SECONDS:
+            del _chunked_uploads[upload_id]
+            try:
+                os.unlink(upload["path"])
+            except OSError:
+                pass
+
+
+def _chunks_cover_length(chunks: dict, length: int) -> bool:
+    """True when the received (offset -> size) ranges cover [0, length)."""
+    end = 0
+    for off in sorted(chunks):
+        if off > end:
+            return False
+        end = max(end, off + chunks[off])
+    return end >= length
+
+
+@app.route("/analyze/chunk", methods=["PUT"])
+def analyze_chunk():
+    if "logged_in" not in session or "user_id" not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    upload_id = request.headers.get("Upload-Id", "")
+    try:
+        offset = int(request.headers.get("Upload-Offset", ""))
+        total = int(request.headers.get("Upload-Length", ""))
+    except ValueError:
+        return jsonify({"error": "Invalid Upload-Offset/Upload-Length header"}), 400
+    if not upload_id or offset < 0 or total <= 0 or offset >= total:
+        return jsonify({"error": "Missing or invalid upload headers"}), 400
+    if total > CHUNKED_UPLOAD_MAX_BYTES:
+        return jsonify({"error": "Declared upload length is too large"}), 413
+
+    chunk = request.get_data()
+    if offset + len(chunk) > total:
+        return jsonify({"error": "Chunk extends past declared Upload-Length"}), 400
+
+    with _chunked_uploads_lock:
+        _sweep_stale_uploads()
+        upload = _chunked_uploads.get(upload_id)
+        if upload is None:
+            part = tempfile.NamedTemporaryFile(
+                delete=False, prefix="chunked_upload_", suffix=".part"
+            )
+            part.truncate(total)
+            part.close()
+            upload = {
+                "path": part.name,
+                "length": total,
+                # offset -> chunk size, so a retried chunk replaces its
+                # earlier attempt instead of inflating a byte counter
+                "chunks": {},
+                "user_id": session["user_id"],
+                "lock": threading.Lock(),
+                "touched": time.monotonic(),
+            }
+            _chunked_uploads[upload_id] = upload
+
+    if upload["user_id"] != session["user_id"]:
+        return jsonify({"error": "Unauthorized"}), 401
+    if total != upload["length"]:
+        return jsonify({"error": "Upload-Length does not match this upload"}), 400
+
+    with upload["lock"]:
+        with open(upload["path"], "r+b") as f:
+            f.seek(offset)
+            f.write(chunk)
+        upload["chunks"][offset] = len(chunk)
+        upload["touched"] = time.monotonic()
+        received = sum(upload["chunks"].values())
+
+    return jsonify({"received": received, "length": upload["length"]})
+
+
+@app.route("/analyze/complete", methods=["POST"])
+async def analyze_complete():
+    if "logged_in" not in session or "user_id" not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    payload = request.get_json(silent=True) or {}
+    upload_id = payload.get("upload_id", "")
+    filename = payload.get("filename") or "upload.bin"
+    content_type = payload.get("content_type") or ""
+
+    with _chunked_uploads_lock:
+        _sweep_stale_uploads()
+        upload = _chunked_uploads.get(upload_id)
+        if upload is None:
+            return jsonify({"error": "Unknown or already completed upload id"}), 400
+        # Ownership is checked before the entry is removed, so a request
+        # with the wrong user cannot destroy the owner's in-flight upload.
+        if upload["user_id"] != session["user_id"]:
+            return jsonify({"error": "Unauthorized"}), 401
+        del _chunked_uploads[upload_id]
+
+    if not _chunks_cover_length(upload["chunks"], upload["length"]):
+        try:
+            os.unlink(upload["path"])
+        except OSError:
+            pass
+        return jsonify({"error": "Upload incomplete; please retry."}), 400
+
+    try:
+        with open(upload["path"], "rb") as f:
+            return await _analyze_payload(filename, content_type, f)
+    finally:
+        try:
+            os.unlink(upload["path"])
+        except OSError:
+            pass
+
+
+# The panel renders summary.slice(0, 80); 120 leaves headroom for the
+# client-side ellipsis check without shipping whole summaries.
+HISTORY_SUMMARY_CHARS = 120
+
+
+@app.route("/user_history", methods=["GET"])
+def user_history():
+    if "logged_in" not in session or "user_id" not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    try:
+        user_id = ObjectId(session["user_id"])
+    except Exception:
+        return jsonify({"history": []})
+
+    # The history only changes when a new evaluation lands, so the newest
+    # timestamp doubles as a validator: a matching If-None-Match skips the
+    # full query and the JSON serialization entirely.
+    latest = evaluations_collection.find_one(
+        {"user_id": user_id}, {"timestamp": 1}, sort=[("timestamp", -1)]
+    )
+    etag = hashlib.blake2b(
+        str(latest.get("timestamp") if latest else "").encode(), digest_size=8
+    ).hexdigest()
+    if etag in request.if_none_match:
+        return "", 304
+
+    # Project only the fields the panel renders, and truncate the summary
+    # server-side: the panel shows at most the first 80 characters, so
+    # shipping full multi-KB summaries for 50 rows is wasted BSON.
+    cursor = evaluations_collection.aggregate(
+        [
+            {"$match": {"user_id": user_id}},
+            {"$sort": {"timestamp": -1}},
+            {"$limit": 50},
+            {
+                "$project": {
+                    "overall_rating": 1,
+                    "original_filename": 1,
+                    "summary": {"$substrCP": ["$summary", 0, HISTORY_SUMMARY_CHARS]},
+                    # Format the timestamp in the pipeline; no per-row
+                    # isinstance/strftime work in Python.
+                    "timestamp": {
+                        "$dateToString": {
+                            "format": "%Y-%m-%d %H:%M:%S",
+                            "date": "$timestamp",
+                            "onNull": "",
+                        }
+                    },
+                }
+            },
+        ]
+    )
+
+    history = [
+        {
+            "timestamp": doc.get("timestamp") or "",
+            "overall_rating": doc.get("overall_rating", "No rating"),
+            "summary": doc.get("summary", ""),
+            "original_filename": doc.get("original_filename", ""),
+        }
+        for doc in cursor
+    ]
+
+    resp = Response(_json_dumps({"history": history}), mimetype="application/json")
+    # no-cache (not max-age): the browser must revalidate every time, so
+    # an analysis that just finished shows up immediately — the cheap 304
+    # path above still carries the caching win when nothing changed.
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
+
+
+if __name__ == "__main__":
+    app.run(debug=True)